@@ -1,9 +1,11 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import users, memberships, sevas, bookings, pages
+from app.api.api_v1.endpoints import users, memberships, sevas, bookings, pages, admin, reports
 
 api_router = APIRouter()
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(memberships.router, prefix="/memberships", tags=["memberships"])
 api_router.include_router(sevas.router, prefix="/sevas", tags=["sevas"])
 api_router.include_router(bookings.router, prefix="/bookings", tags=["bookings"])
-api_router.include_router(pages.router, prefix="/pages", tags=["pages"])
\ No newline at end of file
+api_router.include_router(pages.router, prefix="/pages", tags=["pages"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Administration"])
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
\ No newline at end of file
@@ -0,0 +1,166 @@
+import enum
+import os
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from uuid import UUID
+
+from app import models, schemas
+from app.core.rate_limit import rate_limiter
+from app.core.startup import startup_timer
+from app.db.metrics import pool_metrics
+from app.db.routing import read_router
+from app.db.session import SessionLocal
+from app.utils import security
+from app.utils.jobs import Job, job_manager
+from app.utils.response_cache import page_cache, seva_catalog
+
+router = APIRouter()
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+def _run_member_import(
+    job: Job,
+    members_csv_path: str,
+    address_csv_path: str,
+    batch_size: Optional[int],
+    incremental: bool
+) -> dict:
+    from app.utils.import_data import bulk_import_members_from_csv, incremental_import_members_from_csv
+
+    db = SessionLocal()
+    try:
+        if incremental:
+            created, updated, unchanged, errors = incremental_import_members_from_csv(
+                db, members_csv_path, address_csv_path,
+                batch_size=batch_size, progress=job.report
+            )
+            return {"created": created, "updated": updated, "unchanged": unchanged}
+
+        users_created, memberships_created, errors = bulk_import_members_from_csv(
+            db, members_csv_path, address_csv_path,
+            batch_size=batch_size, progress=job.report
+        )
+        return {
+            "users_created": users_created,
+            "memberships_created": memberships_created,
+        }
+    finally:
+        db.close()
+
+@router.post("/import-data", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+def import_data(
+    members_csv_path: str,
+    address_csv_path: str,
+    batch_size: Optional[int] = None,
+    incremental: bool = False,
+    current_user: models.User = Depends(security.get_current_active_superuser),
+) -> Any:
+    """
+    Start a background import of member data from CSV files (admin only).
+    With incremental, only members whose rows changed are upserted.
+    Poll the returned job for progress.
+    """
+    for path in (members_csv_path, address_csv_path):
+        if not os.path.exists(path):
+            raise HTTPException(status_code=400, detail=f"CSV file not found: {path}")
+
+    return job_manager.submit(
+        "member-import", _run_member_import,
+        members_csv_path, address_csv_path, batch_size, incremental
+    )
+
+def _run_donation_statements(job: Job, financial_year: int) -> dict:
+    from app.utils.statements import generate_statements
+
+    return generate_statements(financial_year, progress=job.report)
+
+@router.post("/donation-statements", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+def generate_donation_statements(
+    financial_year: int = Query(..., ge=2000, le=2100, description="Year the financial year starts in, e.g. 2023 for 2023-24"),
+    current_user: models.User = Depends(security.get_current_active_superuser),
+) -> Any:
+    """
+    Start a background job writing an 80G donation statement for every donor
+    of the financial year (admin only). Poll the returned job for progress.
+    """
+    return job_manager.submit("donation-statements", _run_donation_statements, financial_year)
+
+@router.get("/jobs", response_model=List[schemas.Job])
+def read_jobs(
+    current_user: models.User = Depends(security.get_current_active_superuser),
+) -> Any:
+    """
+    Retrieve recent background jobs, newest first.
+    """
+    return job_manager.list()
+
+@router.get("/jobs/{job_id}", response_model=schemas.Job)
+def read_job(
+    job_id: UUID,
+    current_user: models.User = Depends(security.get_current_active_superuser),
+) -> Any:
+    """
+    Get a background job's status and progress.
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/jobs/{job_id}/cancel", response_model=schemas.Job)
+def cancel_job(
+    job_id: UUID,
+    current_user: models.User = Depends(security.get_current_active_superuser),
+) -> Any:
+    """
+    Cancel a background job. Work already committed is kept.
+    """
+    job = job_manager.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/export/members")
+def export_members(
+    format: ExportFormat = ExportFormat.CSV,
+    current_user: models.User = Depends(security.get_current_active_superuser),
+) -> Any:
+    """
+    Stream every user and their membership (admin only), either as CSV in the
+    FINAL-MEMBER.csv layout or as NDJSON with all fields.
+    """
+    from app.utils.export_data import stream_members_csv, stream_members_ndjson
+
+    if format == ExportFormat.NDJSON:
+        return StreamingResponse(
+            stream_members_ndjson(),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": 'attachment; filename="members.ndjson"'},
+        )
+    return StreamingResponse(
+        stream_members_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="members.csv"'},
+    )
+
+
+@router.get("/metrics")
+def read_metrics(
+    current_user: models.User = Depends(security.get_current_active_superuser),
+) -> Any:
+    """
+    In-process counters for this worker (admin only).
+    """
+    return {
+        "user_cache": security.user_cache.stats(),
+        "seva_catalog": seva_catalog.stats(),
+        "page_cache": page_cache.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "db_pools": {name: metrics.stats() for name, metrics in pool_metrics.items()},
+        "read_routing": read_router.stats(),
+        "startup": startup_timer.stats(),
+    }
@@ -1,97 +1,238 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 from uuid import UUID
+from zoneinfo import ZoneInfo
 
 from app import models, schemas
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.routing import get_read_db
+from app.db.session import get_async_db
+from app.models.booking import PaymentStatus
 from app.utils import security
+from app.utils.idempotency import idempotent_call
+from app.utils.inventory import SoldOut, release_booking_slots, reserve_booking_slots, reserve_slots
+from app.utils.fields import FieldsParam
+from app.utils.pagination import PageParams, paginate
+from app.utils.reconcile import DuplicateReceipt, ReceiptConflict, reconcile_payments
+from app.utils.revenue import add_booking_to_summary, set_payment_status
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Booking])
-def read_bookings(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+def _booking_options(include_seva: bool = False) -> list:
+    """
+    Eager-load what schemas.Booking serializes: the items of every booking in
+    one extra query (and their sevas in the same query when include_seva is
+    set). Any other relationship access raises instead of lazy-loading.
+    """
+    items = selectinload(models.Booking.items)
+    if include_seva:
+        items = items.joinedload(models.BookingItem.seva)
+    return [items, raiseload("*")]
+
+async def _get_booking(db: AsyncSession, booking_id: UUID, include_seva: bool = False) -> models.Booking:
+    """Load a booking with its items, which async sessions can't lazy-load."""
+    result = await db.execute(
+        select(models.Booking)
+        .where(models.Booking.id == booking_id)
+        .options(*_booking_options(include_seva))
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+@router.get("/", response_model=schemas.CursorPage[schemas.Booking])
+async def read_bookings(
+    page: PageParams = Depends(),
+    include_seva: bool = False,
+    fields: FieldsParam = Depends(),
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(security.get_current_active_user),
 ) -> Any:
     """
-    Retrieve bookings.
+    Retrieve bookings, newest first. Two queries per page regardless of
+    its size; include_seva adds each item's seva_name. With fields=, only
+    those columns are fetched, and items only if they are selected.
     """
-    # Admin can see all bookings
-    if current_user.is_admin:
-        bookings = db.query(models.Booking).offset(skip).limit(limit).all()
+    keys = [models.Booking.booking_date, models.Booking.id]
+    fieldset = fields.select(schemas.Booking)
+    query = select(models.Booking)
+    if fieldset:
+        query = query.options(fieldset.load_only(models.Booking, keys))
+    if fieldset and "items" not in fieldset:
+        query = query.options(raiseload("*"))
     else:
+        query = query.options(*_booking_options(include_seva))
+    # Admin can see all bookings
+    if not current_user.is_admin:
         # Regular users can only see their own bookings
-        bookings = db.query(models.Booking).filter(
-            models.Booking.user_id == current_user.id
-        ).offset(skip).limit(limit).all()
+        query = query.where(models.Booking.user_id == current_user.id)
     
-    return bookings
+    result = await paginate(db, query, keys, page, descending=True)
+    return fieldset.page_response(result) if fieldset else result
 
-@router.post("/", response_model=schemas.Booking)
-def create_booking(
-    *,
-    db: Session = Depends(get_db),
-    booking_in: schemas.BookingCreate,
-    current_user: models.User = Depends(security.get_current_active_user),
-) -> Any:
-    """
-    Create new booking.
-    """
+async def _create_booking(
+    db: AsyncSession, booking_in: schemas.BookingCreate, current_user: models.User
+) -> models.Booking:
     # Use current user ID if not specified (and not admin)
     user_id = booking_in.user_id if current_user.is_admin and booking_in.user_id else current_user.id
     
-    # Make sure the user exists
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
+    # Make sure the user exists (only needed when booking for someone else)
+    if user_id != current_user.id and not await db.get(models.User, user_id):
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Create the booking
+    items_in = booking_in.items or []
+    seva_ids = {item_data.seva_id for item_data in items_in}
+    prices, capacities = {}, {}
+    if seva_ids:
+        result = await db.execute(
+            select(models.Seva.id, models.Seva.price, models.Seva.daily_capacity)
+            .where(models.Seva.id.in_(seva_ids))
+        )
+        for seva_id, price, daily_capacity in result.all():
+            prices[seva_id] = price
+            if daily_capacity is not None:
+                capacities[seva_id] = daily_capacity
+    missing = [str(seva_id) for seva_id in seva_ids if seva_id not in prices]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Seva with ID {', '.join(sorted(missing))} not found")
+    
+    items = []
+    slot_quantities = {}
+    today = datetime.now(ZoneInfo(settings.REPORT_TIMEZONE)).date()
+    for item_data in items_in:
+        price = prices[item_data.seva_id]
+        if current_user.is_admin and item_data.price_at_booking is not None:
+            price = item_data.price_at_booking
+        items.append(models.BookingItem(
+            seva_id=item_data.seva_id,
+            quantity=item_data.quantity,
+            price_at_booking=price,
+            slot_date=item_data.slot_date
+        ))
+        if item_data.seva_id in capacities:
+            if item_data.slot_date is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"slot_date is required for seva {item_data.seva_id}, which has a daily capacity"
+                )
+            if item_data.slot_date < today:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"slot_date {item_data.slot_date.isoformat()} for seva {item_data.seva_id} is in the past"
+                )
+            key = (item_data.seva_id, item_data.slot_date)
+            slot_quantities[key] = slot_quantities.get(key, 0) + item_data.quantity
+    
+    # Only admins record payments here; other bookings start PENDING and are
+    # settled by reconciliation or an admin update
+    if current_user.is_admin:
+        payment_status = booking_in.payment_status
+        receipt_id = booking_in.receipt_id
+        payment_gateway_ref = booking_in.payment_gateway_ref
+    else:
+        payment_status, receipt_id, payment_gateway_ref = PaymentStatus.PENDING, None, None
+    
+    donation_amount = booking_in.donation_amount or Decimal("0")
+    total_amount = sum((item.price_at_booking * item.quantity for item in items), Decimal("0")) + donation_amount
+    
+    # Reserve capacity, then create the booking, its items and the revenue
+    # summary update, all in one transaction
+    try:
+        await reserve_slots(db, slot_quantities, capacities)
+    except SoldOut as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    
     booking = models.Booking(
         user_id=user_id,
-        total_amount=booking_in.total_amount,
-        donation_amount=booking_in.donation_amount,
+        total_amount=total_amount,
+        donation_amount=donation_amount,
         pan_number=booking_in.pan_number,
-        payment_status=booking_in.payment_status,
-        receipt_id=booking_in.receipt_id,
-        payment_gateway_ref=booking_in.payment_gateway_ref
+        payment_status=payment_status,
+        receipt_id=receipt_id,
+        payment_gateway_ref=payment_gateway_ref,
+        items=items
     )
     db.add(booking)
-    db.commit()
-    db.refresh(booking)
-    
-    # Add booking items if provided
-    if booking_in.items:
-        for item_data in booking_in.items:
-            # Verify the seva exists
-            seva = db.query(models.Seva).filter(models.Seva.id == item_data.seva_id).first()
-            if not seva:
-                raise HTTPException(status_code=404, detail=f"Seva with ID {item_data.seva_id} not found")
-            
-            booking_item = models.BookingItem(
-                booking_id=booking.id,
-                seva_id=item_data.seva_id,
-                quantity=item_data.quantity,
-                price_at_booking=item_data.price_at_booking or seva.price
-            )
-            db.add(booking_item)
-        
-        db.commit()
+    await db.flush()
+    await add_booking_to_summary(db, booking.id)
+    await db.commit()
     
-    return booking
+    return await _get_booking(db, booking.id)
+
+@router.post("/", response_model=schemas.Booking)
+async def create_booking(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    booking_in: schemas.BookingCreate,
+    idempotency_key: Optional[str] = Header(None),
+    current_user: models.User = Depends(security.get_current_active_user),
+) -> Any:
+    """
+    Create new booking.
+
+    The sevas are validated with a single query and the booking is inserted
+    together with its items in one transaction, so a bad seva id leaves
+    nothing behind. total_amount is computed here as the sum of
+    price_at_booking x quantity plus the donation amount. Only admins may
+    override an item's price or set the payment status, receipt_id and
+    payment_gateway_ref; other users' bookings are always created PENDING.
+
+    Retries that send the same Idempotency-Key get the first response back
+    instead of creating another booking.
+    """
+    return await idempotent_call(
+        idempotency_key,
+        scope=f"bookings:{current_user.id}",
+        payload=booking_in,
+        response_model=schemas.Booking,
+        db=db,
+        call=lambda: _create_booking(db, booking_in, current_user),
+    )
+
+@router.post("/reconcile", response_model=schemas.PaymentReconciliationResult)
+async def reconcile_booking_payments(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    reconciliation_in: schemas.PaymentReconciliation,
+    current_user: models.User = Depends(security.get_current_active_superuser),
+) -> Any:
+    """
+    Apply a batch of payment outcomes from the gateway, matched on
+    payment_gateway_ref (admin only). All or nothing: either every outcome
+    is applied or none is. Each receipt_id may only end up on one booking.
+    """
+    if len(reconciliation_in.items) > settings.RECONCILE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.RECONCILE_MAX_ITEMS} outcomes per request"
+        )
+    outcomes = [
+        (item.payment_gateway_ref, item.payment_status, item.receipt_id)
+        for item in reconciliation_in.items
+    ]
+    try:
+        return await reconcile_payments(db, outcomes)
+    except DuplicateReceipt as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ReceiptConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @router.get("/{booking_id}", response_model=schemas.Booking)
-def read_booking(
+async def read_booking(
     booking_id: UUID,
-    db: Session = Depends(get_db),
+    include_seva: bool = False,
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(security.get_current_active_user),
 ) -> Any:
     """
     Get booking by ID.
     """
-    booking = db.query(models.Booking).filter(models.Booking.id == booking_id).first()
+    booking = await _get_booking(db, booking_id, include_seva)
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
     
@@ -99,4 +240,45 @@ def read_booking(
     if not current_user.is_admin and booking.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    return booking
\ No newline at end of file
+    return booking
+
+@router.put("/{booking_id}", response_model=schemas.Booking)
+async def update_booking(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    booking_id: UUID,
+    booking_in: schemas.BookingUpdate,
+    current_user: models.User = Depends(security.get_current_active_superuser),
+) -> Any:
+    """
+    Update a booking, e.g. its payment status (admin only).
+    """
+    # Lock the booking so concurrent status changes can't both move its totals
+    booking = await db.get(models.Booking, booking_id, with_for_update=True)
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    
+    update_data = booking_in.dict(exclude_unset=True)
+    payment_status = update_data.pop("payment_status", None)
+    donation_amount = update_data.pop("donation_amount", None)
+    if donation_amount is not None:
+        # total_amount includes the donation
+        booking.total_amount += donation_amount - booking.donation_amount
+        booking.donation_amount = donation_amount
+    for field, value in update_data.items():
+        setattr(booking, field, value)
+    
+    if payment_status is not None and payment_status != booking.payment_status:
+        # A failed booking gives its slots back; retrying it takes them again
+        if payment_status == PaymentStatus.FAILED:
+            await release_booking_slots(db, booking.id)
+        elif booking.payment_status == PaymentStatus.FAILED:
+            try:
+                await reserve_booking_slots(db, booking.id)
+            except SoldOut as e:
+                await db.rollback()
+                raise HTTPException(status_code=409, detail=str(e))
+        await set_payment_status(db, booking, payment_status)
+    await db.commit()
+    
+    return await _get_booking(db, booking.id)
\ No newline at end of file
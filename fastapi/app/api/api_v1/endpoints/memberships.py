@@ -1,49 +1,53 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app import models, schemas
-from app.db.session import get_db
+from app.db.routing import get_read_db
+from app.db.session import get_async_db
 from app.utils import security
+from app.utils.idempotency import idempotent_call
+from app.utils.fields import FieldsParam
+from app.utils.pagination import PageParams, paginate
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Membership])
-def read_memberships(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+@router.get("/", response_model=schemas.CursorPage[schemas.Membership])
+async def read_memberships(
+    page: PageParams = Depends(),
+    fields: FieldsParam = Depends(),
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(security.get_current_active_superuser),
 ) -> Any:
     """
-    Retrieve all memberships.
+    Retrieve all memberships, in order of application.
+    With fields=, only those columns are fetched and returned.
     """
-    memberships = db.query(models.Membership).offset(skip).limit(limit).all()
-    return memberships
+    keys = [models.Membership.application_date, models.Membership.id]
+    fieldset = fields.select(schemas.Membership)
+    query = select(models.Membership)
+    if fieldset:
+        query = query.options(fieldset.load_only(models.Membership, keys))
+    result = await paginate(db, query, keys, page)
+    return fieldset.page_response(result) if fieldset else result
 
-@router.post("/", response_model=schemas.Membership)
-def create_membership(
-    *,
-    db: Session = Depends(get_db),
-    membership_in: schemas.MembershipCreate,
-    current_user: models.User = Depends(security.get_current_active_user),
-) -> Any:
-    """
-    Create new membership.
-    """
+async def _create_membership(
+    db: AsyncSession, membership_in: schemas.MembershipCreate
+) -> models.Membership:
     # Check if the user already has a membership
-    existing_membership = db.query(models.Membership).filter(
+    result = await db.execute(select(models.Membership).where(
         models.Membership.user_id == membership_in.user_id
-    ).first()
-    if existing_membership:
+    ))
+    if result.scalars().first():
         raise HTTPException(
             status_code=400,
             detail="This user already has a membership."
         )
     
     # Make sure the referenced user exists
-    user = db.query(models.User).filter(models.User.id == membership_in.user_id).first()
+    user = await db.get(models.User, membership_in.user_id)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -55,20 +59,41 @@ def create_membership(
         **membership_in.dict()
     )
     db.add(membership)
-    db.commit()
-    db.refresh(membership)
+    await db.commit()
+    await db.refresh(membership)
     return membership
 
+@router.post("/", response_model=schemas.Membership)
+async def create_membership(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    membership_in: schemas.MembershipCreate,
+    idempotency_key: Optional[str] = Header(None),
+    current_user: models.User = Depends(security.get_current_active_user),
+) -> Any:
+    """
+    Create new membership. Retries that send the same Idempotency-Key get
+    the first response back.
+    """
+    return await idempotent_call(
+        idempotency_key,
+        scope=f"memberships:{current_user.id}",
+        payload=membership_in,
+        response_model=schemas.Membership,
+        db=db,
+        call=lambda: _create_membership(db, membership_in),
+    )
+
 @router.get("/{membership_id}", response_model=schemas.Membership)
-def read_membership(
+async def read_membership(
     membership_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(security.get_current_active_user),
 ) -> Any:
     """
     Get membership by ID.
     """
-    membership = db.query(models.Membership).filter(models.Membership.id == membership_id).first()
+    membership = await db.get(models.Membership, membership_id)
     if not membership:
         raise HTTPException(status_code=404, detail="Membership not found")
     
@@ -79,9 +104,9 @@ def read_membership(
     return membership
 
 @router.put("/{membership_id}", response_model=schemas.Membership)
-def update_membership(
+async def update_membership(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     membership_id: UUID,
     membership_in: schemas.MembershipUpdate,
     current_user: models.User = Depends(security.get_current_active_superuser),
@@ -89,7 +114,7 @@ def update_membership(
     """
     Update a membership.
     """
-    membership = db.query(models.Membership).filter(models.Membership.id == membership_id).first()
+    membership = await db.get(models.Membership, membership_id)
     if not membership:
         raise HTTPException(status_code=404, detail="Membership not found")
     
@@ -99,14 +124,14 @@ def update_membership(
         setattr(membership, field, value)
     
     db.add(membership)
-    db.commit()
-    db.refresh(membership)
+    await db.commit()
+    await db.refresh(membership)
     return membership
 
 @router.get("/user/{user_id}", response_model=schemas.Membership)
-def get_membership_by_user(
+async def get_membership_by_user(
     user_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(security.get_current_active_user),
 ) -> Any:
     """
@@ -116,7 +141,8 @@ def get_membership_by_user(
     if not current_user.is_admin and user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    membership = db.query(models.Membership).filter(models.Membership.user_id == user_id).first()
+    result = await db.execute(select(models.Membership).where(models.Membership.user_id == user_id))
+    membership = result.scalars().first()
     if not membership:
         raise HTTPException(status_code=404, detail="Membership not found for this user")
     
@@ -1,30 +1,55 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import Float, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app import models, schemas
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.routing import get_read_db, read_session
+from app.db.session import get_async_db
+from app.models.page import SEARCH_CONFIG
 from app.utils import security
+from app.utils.fields import FieldsParam
+from app.utils.pagination import PageParams, decode_cursor, encode_cursor, paginate
+from app.utils.response_cache import cached_json, cached_json_response, page_cache
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Page])
-def read_pages(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+def _page_etag(page: models.Page) -> str:
+    # updated_at changes on every write to the page
+    return f'"{page.id.hex}.{int(page.updated_at.timestamp() * 1000000)}"'
+
+@router.get("/", response_model=schemas.CursorPage[schemas.Page])
+async def read_pages(
+    request: Request,
+    page: PageParams = Depends(),
+    fields: FieldsParam = Depends(),
 ) -> Any:
     """
-    Retrieve published pages.
+    Retrieve published pages, oldest first.
+    Served from the page cache; If-None-Match gets a 304. With fields=,
+    e.g. fields=title,slug, content is neither fetched nor returned.
     """
-    pages = db.query(models.Page).filter(models.Page.is_published == True).offset(skip).limit(limit).all()
-    return pages
+    fieldset = fields.select(schemas.Page)
+    key = ("list", page.cursor, page.limit, fieldset.names if fieldset else None)
+    cached = page_cache.get(key)
+    if cached is None:
+        version = page_cache.version
+        keys = [models.Page.created_at, models.Page.id]
+        query = select(models.Page).where(models.Page.is_published == True)
+        if fieldset:
+            query = query.options(fieldset.load_only(models.Page, keys))
+        async with read_session(request) as db:
+            result = await paginate(db, query, keys, page)
+        cached = cached_json(fieldset.page(result) if fieldset else schemas.CursorPage[schemas.Page].parse_obj(result))
+        page_cache.set_if_current(key, cached, version)
+    return cached_json_response(request, cached, settings.PAGE_CACHE_CONTROL)
 
 @router.post("/", response_model=schemas.Page)
-def create_page(
+async def create_page(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     page_in: schemas.PageCreate,
     current_user: models.User = Depends(security.get_current_active_superuser),
 ) -> Any:
@@ -32,8 +57,8 @@ def create_page(
     Create new page.
     """
     # Check if page with the same slug already exists
-    page = db.query(models.Page).filter(models.Page.slug == page_in.slug).first()
-    if page:
+    result = await db.execute(select(models.Page).where(models.Page.slug == page_in.slug))
+    if result.scalars().first():
         raise HTTPException(
             status_code=400,
             detail="A page with this slug already exists."
@@ -44,50 +69,117 @@ def create_page(
         created_by=current_user.id
     )
     db.add(page)
-    db.commit()
-    db.refresh(page)
+    await db.commit()
+    page_cache.invalidate_all()
+    await db.refresh(page)
     return page
 
-@router.get("/all", response_model=List[schemas.Page])
-def read_all_pages(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+@router.get("/all", response_model=schemas.CursorPage[schemas.Page])
+async def read_all_pages(
+    page: PageParams = Depends(),
+    fields: FieldsParam = Depends(),
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(security.get_current_active_superuser),
 ) -> Any:
     """
     Retrieve all pages, including unpublished ones (admin only).
     """
-    pages = db.query(models.Page).offset(skip).limit(limit).all()
-    return pages
+    keys = [models.Page.created_at, models.Page.id]
+    fieldset = fields.select(schemas.Page)
+    query = select(models.Page)
+    if fieldset:
+        query = query.options(fieldset.load_only(models.Page, keys))
+    result = await paginate(db, query, keys, page)
+    return fieldset.page_response(result) if fieldset else result
+
+# Up to two fragments of about 10-30 words around the matches
+SNIPPET_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MinWords=10, MaxWords=30"
+
+@router.get("/search", response_model=schemas.CursorPage[schemas.PageSearchResult])
+async def search_pages(
+    q: str = Query(..., min_length=1, max_length=200, description="Words, \"quoted phrases\", or and -excluded words"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Optional[models.User] = Depends(security.get_current_user_optional),
+) -> Any:
+    """
+    Full-text search over page titles and content, best matches first.
+    Only admins get unpublished pages.
+
+    Matches are found through the GIN index on Page.search_vector. Ranks are
+    computed for the matches only, and snippets for the returned page only.
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(models.Page.search_vector, tsquery, type_=Float)
+    keys = [rank, models.Page.id]
+
+    matches = select(models.Page.id, rank.label("rank")).where(models.Page.search_vector.op("@@")(tsquery))
+    if not (current_user and current_user.is_admin):
+        matches = matches.where(models.Page.is_published == True)
+    if page.cursor:
+        position = tuple_(*decode_cursor(page.cursor, keys), types=[key.type for key in keys])
+        matches = matches.where(tuple_(*keys) < position)
+    # One extra row tells us whether there is a next page
+    matches = matches.order_by(rank.desc(), models.Page.id.desc()).limit(page.limit + 1).subquery()
+
+    result = await db.execute(
+        select(
+            models.Page.id,
+            models.Page.title,
+            models.Page.slug,
+            models.Page.is_published,
+            models.Page.updated_at,
+            matches.c.rank,
+            func.ts_headline(
+                SEARCH_CONFIG, models.Page.content, tsquery, SNIPPET_OPTIONS
+            ).label("snippet"),
+        )
+        .join(matches, matches.c.id == models.Page.id)
+        .order_by(matches.c.rank.desc(), models.Page.id.desc())
+    )
+    items = result.mappings().all()
+
+    next_cursor = None
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        next_cursor = encode_cursor([items[-1]["rank"], items[-1]["id"]])
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/{slug}", response_model=schemas.Page)
-def read_page_by_slug(
+async def read_page_by_slug(
+    request: Request,
     slug: str,
-    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(security.get_current_user_optional),
 ) -> Any:
     """
     Get page by slug.
+    Published pages are served from the page cache with an ETag and
+    Last-Modified from updated_at; a matching conditional GET gets a 304.
     """
-    page = db.query(models.Page).filter(models.Page.slug == slug).first()
-    if not page:
-        raise HTTPException(status_code=404, detail="Page not found")
-    
-    if not page.is_published:
+    key = ("slug", slug)
+    cached = page_cache.get(key)
+    if cached is None:
+        version = page_cache.version
+        async with read_session(request) as db:
+            result = await db.execute(select(models.Page).where(models.Page.slug == slug))
+            page = result.scalars().first()
+        if not page:
+            raise HTTPException(status_code=404, detail="Page not found")
+        
         # If page is not published, only admins can view it
-        try:
-            current_user = security.get_current_active_user()
-            if not current_user.is_admin:
+        if not page.is_published:
+            if not (current_user and current_user.is_admin):
                 raise HTTPException(status_code=404, detail="Page not found")
-        except:
-            raise HTTPException(status_code=404, detail="Page not found")
-    
-    return page
+            return page
+        
+        cached = cached_json(schemas.Page.from_orm(page), etag=_page_etag(page), last_modified=page.updated_at)
+        page_cache.set_if_current(key, cached, version)
+    return cached_json_response(request, cached, settings.PAGE_CACHE_CONTROL)
 
 @router.put("/{page_id}", response_model=schemas.Page)
-def update_page(
+async def update_page(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     page_id: UUID,
     page_in: schemas.PageUpdate,
     current_user: models.User = Depends(security.get_current_active_superuser),
@@ -95,17 +187,17 @@ def update_page(
     """
     Update a page.
     """
-    page = db.query(models.Page).filter(models.Page.id == page_id).first()
+    page = await db.get(models.Page, page_id)
     if not page:
         raise HTTPException(status_code=404, detail="Page not found")
     
     if page_in.slug:
         # Check that the new slug doesn't conflict with another page
-        existing_page = db.query(models.Page).filter(
+        result = await db.execute(select(models.Page).where(
             models.Page.slug == page_in.slug,
             models.Page.id != page_id
-        ).first()
-        if existing_page:
+        ))
+        if result.scalars().first():
             raise HTTPException(
                 status_code=400,
                 detail="A page with this slug already exists."
@@ -117,6 +209,7 @@ def update_page(
         setattr(page, field, value)
     
     db.add(page)
-    db.commit()
-    db.refresh(page)
+    await db.commit()
+    page_cache.invalidate_all()
+    await db.refresh(page)
     return page
\ No newline at end of file
@@ -0,0 +1,88 @@
+from datetime import date
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from app import models, schemas
+from app.db.routing import get_read_db
+from app.models.booking import PaymentStatus
+from app.models.seva_summary import SevaDailySummary
+from app.utils import security
+
+router = APIRouter()
+
+def _filtered(query, start_date, end_date, seva_id, payment_status):
+    if start_date:
+        query = query.where(SevaDailySummary.summary_date >= start_date)
+    if end_date:
+        query = query.where(SevaDailySummary.summary_date <= end_date)
+    if seva_id:
+        query = query.where(SevaDailySummary.seva_id == seva_id)
+    if payment_status:
+        query = query.where(SevaDailySummary.payment_status == payment_status)
+    return query
+
+def _check_range(start_date: Optional[date], end_date: Optional[date]) -> None:
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+@router.get("/seva-revenue", response_model=List[schemas.SevaRevenue])
+async def read_seva_revenue(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    seva_id: Optional[UUID] = None,
+    payment_status: Optional[PaymentStatus] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(security.get_current_active_superuser),
+) -> Any:
+    """
+    Quantity and amount booked per seva, per day and payment status (admin only).
+    Days are calendar days in REPORT_TIMEZONE.
+    """
+    _check_range(start_date, end_date)
+    query = (
+        select(
+            SevaDailySummary.seva_id,
+            models.Seva.name.label("seva_name"),
+            SevaDailySummary.summary_date,
+            SevaDailySummary.payment_status,
+            SevaDailySummary.quantity,
+            SevaDailySummary.amount,
+        )
+        .join(models.Seva, models.Seva.id == SevaDailySummary.seva_id)
+        .where(SevaDailySummary.quantity != 0)
+        .order_by(SevaDailySummary.summary_date, models.Seva.name, SevaDailySummary.payment_status)
+    )
+    result = await db.execute(_filtered(query, start_date, end_date, seva_id, payment_status))
+    return result.mappings().all()
+
+@router.get("/seva-revenue/totals", response_model=List[schemas.SevaRevenueTotal])
+async def read_seva_revenue_totals(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    seva_id: Optional[UUID] = None,
+    payment_status: Optional[PaymentStatus] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(security.get_current_active_superuser),
+) -> Any:
+    """
+    Quantity and amount per seva and payment status over a date range (admin only).
+    """
+    _check_range(start_date, end_date)
+    query = (
+        select(
+            SevaDailySummary.seva_id,
+            models.Seva.name.label("seva_name"),
+            SevaDailySummary.payment_status,
+            func.sum(SevaDailySummary.quantity).label("quantity"),
+            func.sum(SevaDailySummary.amount).label("amount"),
+        )
+        .join(models.Seva, models.Seva.id == SevaDailySummary.seva_id)
+        .group_by(SevaDailySummary.seva_id, models.Seva.name, SevaDailySummary.payment_status)
+        .having(func.sum(SevaDailySummary.quantity) != 0)
+        .order_by(models.Seva.name, SevaDailySummary.payment_status)
+    )
+    result = await db.execute(_filtered(query, start_date, end_date, seva_id, payment_status))
+    return result.mappings().all()
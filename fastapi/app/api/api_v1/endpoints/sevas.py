@@ -1,38 +1,59 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app import models, schemas
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.routing import get_read_db, read_session
+from app.db.session import get_async_db
 from app.utils import security
+from app.utils.fields import FieldsParam
+from app.utils.pagination import PageParams, paginate
+from app.utils.response_cache import cached_json, cached_json_response, seva_catalog
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Seva])
-def read_sevas(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+@router.get("/", response_model=schemas.CursorPage[schemas.Seva])
+async def read_sevas(
+    request: Request,
+    page: PageParams = Depends(),
+    fields: FieldsParam = Depends(),
 ) -> Any:
     """
-    Retrieve all active sevas.
+    Retrieve all active sevas, by name.
+    Served from the catalog cache; If-None-Match gets a 304.
     """
-    sevas = db.query(models.Seva).filter(models.Seva.is_active == True).offset(skip).limit(limit).all()
-    return sevas
+    fieldset = fields.select(schemas.Seva)
+    key = ("list", page.cursor, page.limit, fieldset.names if fieldset else None)
+    cached = seva_catalog.get(key)
+    if cached is None:
+        version = seva_catalog.version
+        keys = [models.Seva.name, models.Seva.id]
+        query = select(models.Seva).where(models.Seva.is_active == True)
+        if fieldset:
+            query = query.options(fieldset.load_only(models.Seva, keys))
+        async with read_session(request) as db:
+            result = await paginate(db, query, keys, page)
+        cached = cached_json(fieldset.page(result) if fieldset else schemas.CursorPage[schemas.Seva].parse_obj(result))
+        seva_catalog.set_if_current(key, cached, version)
+    return cached_json_response(request, cached, settings.SEVA_CACHE_CONTROL)
 
 @router.post("/", response_model=schemas.Seva)
-def create_seva(
+async def create_seva(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     seva_in: schemas.SevaCreate,
     current_user: models.User = Depends(security.get_current_active_superuser),
 ) -> Any:
     """
     Create new seva.
     """
-    seva = db.query(models.Seva).filter(models.Seva.name == seva_in.name).first()
-    if seva:
+    result = await db.execute(select(models.Seva).where(models.Seva.name == seva_in.name))
+    if result.scalars().first():
         raise HTTPException(
             status_code=400,
             detail="A seva with this name already exists."
@@ -40,27 +61,36 @@ def create_seva(
     
     seva = models.Seva(**seva_in.dict())
     db.add(seva)
-    db.commit()
-    db.refresh(seva)
+    await db.commit()
+    seva_catalog.invalidate_all()
+    await db.refresh(seva)
     return seva
 
 @router.get("/{seva_id}", response_model=schemas.Seva)
-def read_seva(
+async def read_seva(
+    request: Request,
     seva_id: UUID,
-    db: Session = Depends(get_db),
 ) -> Any:
     """
     Get seva by ID.
+    Served from the catalog cache; If-None-Match gets a 304.
     """
-    seva = db.query(models.Seva).filter(models.Seva.id == seva_id).first()
-    if not seva:
-        raise HTTPException(status_code=404, detail="Seva not found")
-    return seva
+    key = ("seva", seva_id)
+    cached = seva_catalog.get(key)
+    if cached is None:
+        version = seva_catalog.version
+        async with read_session(request) as db:
+            seva = await db.get(models.Seva, seva_id)
+            if not seva:
+                raise HTTPException(status_code=404, detail="Seva not found")
+            cached = cached_json(schemas.Seva.from_orm(seva))
+        seva_catalog.set_if_current(key, cached, version)
+    return cached_json_response(request, cached, settings.SEVA_CACHE_CONTROL)
 
 @router.put("/{seva_id}", response_model=schemas.Seva)
-def update_seva(
+async def update_seva(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     seva_id: UUID,
     seva_in: schemas.SevaUpdate,
     current_user: models.User = Depends(security.get_current_active_superuser),
@@ -68,7 +98,7 @@ def update_seva(
     """
     Update a seva.
     """
-    seva = db.query(models.Seva).filter(models.Seva.id == seva_id).first()
+    seva = await db.get(models.Seva, seva_id)
     if not seva:
         raise HTTPException(status_code=404, detail="Seva not found")
     
@@ -78,6 +108,67 @@ def update_seva(
         setattr(seva, field, value)
     
     db.add(seva)
-    db.commit()
-    db.refresh(seva)
-    return seva
\ No newline at end of file
+    await db.commit()
+    seva_catalog.invalidate_all()
+    await db.refresh(seva)
+    return seva
+
+@router.get("/{seva_id}/slots", response_model=List[schemas.SevaSlot])
+async def read_seva_slots(
+    seva_id: UUID,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+) -> Any:
+    """
+    Capacity and availability of a seva's slots that have bookings or a
+    capacity override. Other dates have the seva's full daily_capacity.
+    """
+    query = select(models.SevaSlot).where(models.SevaSlot.seva_id == seva_id)
+    if start_date:
+        query = query.where(models.SevaSlot.slot_date >= start_date)
+    if end_date:
+        query = query.where(models.SevaSlot.slot_date <= end_date)
+    result = await db.execute(query.order_by(models.SevaSlot.slot_date))
+    return result.scalars().all()
+
+@router.put("/{seva_id}/slots/{slot_date}", response_model=schemas.SevaSlot)
+async def update_seva_slot(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    seva_id: UUID,
+    slot_date: date,
+    slot_in: schemas.SevaSlotUpdate,
+    current_user: models.User = Depends(security.get_current_active_superuser),
+) -> Any:
+    """
+    Set the capacity of a seva on one date, e.g. extra pooja slots on a
+    festival day. The seva must have a daily_capacity.
+    """
+    seva = await db.get(models.Seva, seva_id)
+    if not seva:
+        raise HTTPException(status_code=404, detail="Seva not found")
+    if seva.daily_capacity is None:
+        raise HTTPException(status_code=400, detail="This seva has no daily capacity")
+    
+    await db.execute(
+        pg_insert(models.SevaSlot)
+        .values(seva_id=seva_id, slot_date=slot_date, capacity=slot_in.capacity, reserved=0)
+        .on_conflict_do_nothing(index_elements=["seva_id", "slot_date"])
+    )
+    result = await db.execute(
+        update(models.SevaSlot)
+        .where(
+            models.SevaSlot.seva_id == seva_id,
+            models.SevaSlot.slot_date == slot_date,
+            models.SevaSlot.reserved <= slot_in.capacity,
+        )
+        .values(capacity=slot_in.capacity)
+        .returning(models.SevaSlot)
+    )
+    slot = result.scalars().first()
+    if not slot:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="More than this capacity is already reserved")
+    await db.commit()
+    return slot
\ No newline at end of file
@@ -1,38 +1,46 @@
-from typing import Any, List
+from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app import models, schemas
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.utils import security
+from app.utils.fields import FieldsParam
+from app.utils.pagination import PageParams, paginate
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.User])
-def read_users(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+@router.get("/", response_model=schemas.CursorPage[schemas.User])
+async def read_users(
+    page: PageParams = Depends(),
+    fields: FieldsParam = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(security.get_current_active_superuser),
 ) -> Any:
     """
-    Retrieve users.
+    Retrieve users, oldest first.
     """
-    users = db.query(models.User).offset(skip).limit(limit).all()
-    return users
+    keys = [models.User.created_at, models.User.id]
+    fieldset = fields.select(schemas.User)
+    query = select(models.User)
+    if fieldset:
+        query = query.options(fieldset.load_only(models.User, keys))
+    result = await paginate(db, query, keys, page)
+    return fieldset.page_response(result) if fieldset else result
 
 @router.post("/", response_model=schemas.User)
-def create_user(
+async def create_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: schemas.UserCreate,
 ) -> Any:
     """
     Create new user.
     """
-    user = db.query(models.User).filter(models.User.email == user_in.email).first()
-    if user:
+    result = await db.execute(select(models.User).where(models.User.email == user_in.email))
+    if result.scalars().first():
         raise HTTPException(
             status_code=400,
             detail="A user with this email already exists."
@@ -47,29 +55,29 @@ def create_user(
         is_admin=user_in.is_admin,
     )
     if user_in.password:
-        user.password_hash = security.get_password_hash(user_in.password)
+        user.password_hash = await security.get_password_hash_async(user_in.password)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 @router.get("/{user_id}", response_model=schemas.User)
-def read_user(
+async def read_user(
     user_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     Get user by ID.
     """
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 @router.put("/{user_id}", response_model=schemas.User)
-def update_user(
+async def update_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: UUID,
     user_in: schemas.UserUpdate,
     current_user: models.User = Depends(security.get_current_active_user),
@@ -77,7 +85,7 @@ def update_user(
     """
     Update a user.
     """
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -87,13 +95,14 @@ def update_user(
     update_data = user_in.dict(exclude_unset=True)
     
     if "password" in update_data and update_data["password"]:
-        update_data["password_hash"] = security.get_password_hash(update_data["password"])
+        update_data["password_hash"] = await security.get_password_hash_async(update_data["password"])
         del update_data["password"]
     
     for field, value in update_data.items():
         setattr(user, field, value)
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    security.invalidate_cached_user(user.id)
+    await db.refresh(user)
     return user
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseSettings, PostgresDsn
-from typing import Optional
+from typing import Dict, Optional
 import secrets
 
 class Settings(BaseSettings):
@@ -12,11 +12,120 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "gsb_mandal"
     SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
+    # asyncpg URI used by the API; the sync URI is kept for init_db.py and jobs
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[PostgresDsn] = None
+
+    # Optional read replica for read-only endpoints (same credentials and DB name)
+    REPLICA_POSTGRES_SERVER: Optional[str] = None
+    SQLALCHEMY_REPLICA_DATABASE_URI: Optional[PostgresDsn] = None
+    # Serve reads from the primary when the replica can't be reached
+    REPLICA_FALLBACK_TO_PRIMARY: bool = True
+    # Seconds to skip the replica after it failed to connect
+    REPLICA_RETRY_SECONDS: int = 30
+    # Seconds after a client's write during which its reads go to the primary
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    # Connection pool settings
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Seconds to wait for a free connection before failing the request
+    DB_POOL_TIMEOUT: float = 30
+    # Seconds after which connections are replaced; -1 disables
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Server-side statement_timeout in milliseconds; None leaves the server default
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None
+
+    # Idempotency-Key support on POST /bookings and POST /memberships.
+    # "memory" is per worker; use "database" when running several workers
+    IDEMPOTENCY_STORE: str = "memory"
+    # Seconds a stored response is replayed for
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    # Seconds a duplicate waits for the first request before getting a 409
+    IDEMPOTENCY_WAIT_SECONDS: int = 30
+    # Seconds a claim on a key is held by the database store; it is renewed
+    # while the request runs, and a crashed worker's claim is taken over after it.
+    # Keep it above the request timeout
+    IDEMPOTENCY_LEASE_SECONDS: int = 120
+
+    # Timezone whose calendar days the revenue summary, reports and seva
+    # slot dates use
+    REPORT_TIMEZONE: str = "Asia/Kolkata"
+
+    # Startup: no DB work happens at import time. Optionally verify on startup
+    # that migrations are applied (refuses to start otherwise)
+    CHECK_SCHEMA_ON_STARTUP: bool = False
+    # Import + startup time above this is logged as a warning
+    STARTUP_TIME_BUDGET_SECONDS: float = 2.0
     
     # Security settings
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Threads that run bcrypt hashing/verification off the event loop
+    PASSWORD_HASH_WORKERS: int = 2
+    # Resolved users are cached per worker for this long (at most 300s), keyed
+    # by token subject. Changes made through the API or an import job clear
+    # this worker's copy at once; other workers see them after the TTL
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_SIZE: int = 1024
+    # Seva catalog responses are cached per worker; writes through the API
+    # clear this worker's copy at once, other workers' after the TTL
+    SEVA_CACHE_TTL_SECONDS: int = 60
+    SEVA_CACHE_SIZE: int = 256
+    SEVA_CACHE_CONTROL: str = "public, max-age=60"
+    # Published pages are cached the same way, bounded by total body size;
+    # clients revalidate every time and get a 304 if unchanged
+    PAGE_CACHE_TTL_SECONDS: int = 60
+    PAGE_CACHE_SIZE: int = 1024
+    PAGE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    PAGE_CACHE_CONTROL: str = "public, no-cache"
+
+    # Rate limiting for expensive endpoints
+    RATE_LIMIT_ENABLED: bool = True
+    # "<METHOD> <path under API_V1_STR>": "<requests>/<seconds>", per client
+    RATE_LIMITS: Dict[str, str] = {
+        "POST /auth/login": "10/60",
+        "POST /users": "5/60",
+        "POST /admin/import-data": "2/60",
+        "POST /admin/donation-statements": "2/60",
+    }
+    # Clients tracked per route before the least recently seen is dropped
+    RATE_LIMIT_MAX_CLIENTS: int = 10000
+    # Only enable behind a proxy that sets X-Forwarded-For
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+
+    # CSV import settings
+    # Rows inserted and committed per batch by the bulk importer
+    IMPORT_BATCH_SIZE: int = 1000
+
+    # Background job settings
+    # Worker threads for admin jobs such as CSV imports
+    JOB_WORKERS: int = 2
+    # Number of jobs kept in memory for progress polling
+    JOB_HISTORY_SIZE: int = 100
+
+    # Export settings
+    # Rows fetched per server-side cursor round trip when streaming exports
+    EXPORT_CHUNK_SIZE: int = 1000
+
+    # Payment reconciliation settings
+    # Outcomes applied per set-based statement
+    RECONCILE_CHUNK_SIZE: int = 5000
+    # Most outcomes accepted in one request
+    RECONCILE_MAX_ITEMS: int = 50000
+
+    # 80G donation statement settings
+    # Statements are written to <STATEMENT_OUTPUT_DIR>/FY<year>/
+    STATEMENT_OUTPUT_DIR: str = "statements"
+    # Processes rendering statements, and donors sent to each per task
+    STATEMENT_WORKERS: int = 4
+    STATEMENT_CHUNK_SIZE: int = 200
+    # Printed on every statement
+    STATEMENT_ORGANIZATION_NAME: str = "GSB Mandal Thane"
+    STATEMENT_ORGANIZATION_ADDRESS: str = ""
+    STATEMENT_ORGANIZATION_PAN: str = ""
+    STATEMENT_80G_REGISTRATION: str = ""
     
     class Config:
         case_sensitive = True
@@ -32,4 +141,20 @@ if settings.POSTGRES_SERVER and settings.POSTGRES_USER and settings.POSTGRES_PAS
         password=settings.POSTGRES_PASSWORD,
         host=settings.POSTGRES_SERVER,
         path=f"/{settings.POSTGRES_DB}"
+    )
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI = PostgresDsn.build(
+        scheme="postgresql+asyncpg",
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        host=settings.POSTGRES_SERVER,
+        path=f"/{settings.POSTGRES_DB}"
+    )
+
+if settings.REPLICA_POSTGRES_SERVER:
+    settings.SQLALCHEMY_REPLICA_DATABASE_URI = PostgresDsn.build(
+        scheme="postgresql+asyncpg",
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        host=settings.REPLICA_POSTGRES_SERVER,
+        path=f"/{settings.POSTGRES_DB}"
     )
\ No newline at end of file
@@ -0,0 +1,113 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+class RateLimitRule:
+    """Allow `requests` per `seconds` per client, refilled continuously."""
+
+    def __init__(self, route: str, spec: str, max_clients: int):
+        requests, seconds = spec.split("/")
+        self.route = route
+        self.capacity = float(requests)
+        self.refill_rate = self.capacity / float(seconds)
+        self.max_clients = max_clients
+        self.admitted = 0
+        self.rejected = 0
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def take(self, client: str, now: float) -> Optional[float]:
+        """Take a token for client; return seconds to wait if there is none."""
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.capacity, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.refill_rate)
+            bucket.updated = now
+            self._buckets.move_to_end(client)
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            self.admitted += 1
+            return None
+        self.rejected += 1
+        return (1 - bucket.tokens) / self.refill_rate
+
+class RateLimiter:
+    """
+    Per-route, per-client token buckets.
+
+    Rules are keyed by "METHOD /path" relative to API_V1_STR, with values
+    like "10/60" for ten requests per minute.
+    """
+
+    def __init__(self, rules: Dict[str, str], prefix: str, max_clients: int):
+        self.rules: Dict[Tuple[str, str], RateLimitRule] = {}
+        for route, spec in rules.items():
+            method, path = route.split(" ", 1)
+            key = (method.upper(), (prefix + path).rstrip("/"))
+            self.rules[key] = RateLimitRule(route, spec, max_clients)
+
+    def check(self, method: str, path: str, client: str) -> Optional[float]:
+        rule = self.rules.get((method, path.rstrip("/")))
+        if rule is None:
+            return None
+        return rule.take(client, time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            rule.route: {"admitted": rule.admitted, "rejected": rule.rejected}
+            for rule in self.rules.values()
+        }
+
+class RateLimitMiddleware:
+    """
+    Rejects over-limit requests with 429 and Retry-After before routing,
+    so no dependency (and no DB session) runs for them.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: "RateLimiter", trust_forwarded_for: bool = False):
+        self.app = app
+        self.limiter = limiter
+        self.trust_forwarded_for = trust_forwarded_for
+
+    def _client(self, scope: Scope) -> str:
+        if self.trust_forwarded_for:
+            for name, value in scope.get("headers", []):
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            retry_after = self.limiter.check(scope["method"], scope["path"], self._client(scope))
+            if retry_after is not None:
+                response = JSONResponse(
+                    {"detail": "Too many requests"},
+                    status_code=429,
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+rate_limiter = RateLimiter(
+    settings.RATE_LIMITS if settings.RATE_LIMIT_ENABLED else {},
+    prefix=settings.API_V1_STR,
+    max_clients=settings.RATE_LIMIT_MAX_CLIENTS
+)
@@ -0,0 +1,37 @@
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class StartupTimer:
+    """
+    Measures how long a worker takes from importing the app until it is
+    ready to serve, against STARTUP_TIME_BUDGET_SECONDS.
+    """
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.seconds: Optional[float] = None
+
+    def finish(self, started: float) -> float:
+        """Record the time since `started` (a time.perf_counter() reading)."""
+        self.seconds = time.perf_counter() - started
+        if self.seconds > self.budget:
+            logger.warning(
+                f"Startup took {self.seconds:.3f}s, over the {self.budget:.3f}s budget"
+            )
+        else:
+            logger.info(f"Startup took {self.seconds:.3f}s (budget {self.budget:.3f}s)")
+        return self.seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "seconds": self.seconds,
+            "budget_seconds": self.budget,
+            "over_budget": self.seconds is not None and self.seconds > self.budget,
+        }
+
+startup_timer = StartupTimer(budget=settings.STARTUP_TIME_BUDGET_SECONDS)
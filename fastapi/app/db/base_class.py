@@ -15,8 +15,7 @@ class Base:
         UUID(as_uuid=True), 
         primary_key=True, 
         default=uuid.uuid4, 
-        nullable=False,
-        index=True
+        nullable=False
     )
 
 # Create the declarative base used by SQLAlchemy
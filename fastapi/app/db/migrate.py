@@ -0,0 +1,55 @@
+import logging
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Revision matching the schema Base.metadata.create_all used to build
+BASELINE_REVISION = "0001"
+
+def alembic_config() -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    return config
+
+def upgrade_database(revision: str = "head") -> None:
+    """
+    Bring the database schema up to `revision` with Alembic.
+
+    A database created by the old create_all() call has tables but no
+    alembic_version; it is stamped at the baseline first so only the later
+    revisions run against it.
+    """
+    config = alembic_config()
+    with engine.connect() as connection:
+        tables = set(inspect(connection).get_table_names())
+    if "alembic_version" not in tables and "user" in tables:
+        logger.info(f"Unversioned schema found, stamping it at revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, revision)
+
+class SchemaOutOfDate(RuntimeError):
+    """The database is not at the latest migration revision."""
+
+def check_schema(connection: Connection) -> None:
+    """
+    Raise SchemaOutOfDate unless the database is at the migration head(s).
+    Takes a sync connection, so async callers use `await conn.run_sync(check_schema)`.
+    """
+    heads = set(ScriptDirectory.from_config(alembic_config()).get_heads())
+    current = set(MigrationContext.configure(connection).get_current_heads())
+    if current != heads:
+        raise SchemaOutOfDate(
+            f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+            f"expected {', '.join(sorted(heads))}; run `alembic upgrade head`"
+        )
@@ -0,0 +1,138 @@
+import hashlib
+import hmac
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import Request
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db import session
+
+logger = logging.getLogger(__name__)
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Carries the end of a client's read-your-writes window, so whichever worker
+# serves its next read knows about the write. Browsers send the cookie back;
+# other clients can echo the response header.
+READ_YOUR_WRITES_COOKIE = "read_your_writes"
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+def _signature(until: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), until.encode(), hashlib.sha256).hexdigest()[:32]
+
+def read_your_writes_token() -> str:
+    """A signed token valid until READ_YOUR_WRITES_SECONDS from now."""
+    until = str(math.ceil(time.time() + settings.READ_YOUR_WRITES_SECONDS))
+    return f"{until}.{_signature(until)}"
+
+def wrote_recently(token: Optional[str]) -> bool:
+    """Whether token is a valid read_your_writes_token that has not expired."""
+    if not token:
+        return False
+    until, _, signature = token.partition(".")
+    if not until.isdigit() or not hmac.compare_digest(signature, _signature(until)):
+        return False
+    return int(until) > time.time()
+
+class ReadRouter:
+    """Counts where reads went and remembers when the replica was down."""
+
+    def __init__(self):
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.fallbacks = 0
+        self.replica_down_until = 0.0
+
+    def replica_available(self) -> bool:
+        return session.ReplicaSessionLocal is not None and time.monotonic() >= self.replica_down_until
+
+    def mark_replica_down(self) -> None:
+        self.fallbacks += 1
+        self.replica_down_until = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replica_configured": session.ReplicaSessionLocal is not None,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "fallbacks": self.fallbacks,
+            "replica_down": session.ReplicaSessionLocal is not None and not self.replica_available(),
+        }
+
+read_router = ReadRouter()
+
+class ReadYourWritesMiddleware:
+    """
+    Hands clients whose write requests succeeded a signed token, as a
+    cookie and a response header, so read_session on any worker can send
+    their reads to the primary until the replica has caught up.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                token = read_your_writes_token()
+                cookie = (
+                    f"{READ_YOUR_WRITES_COOKIE}={token}; Max-Age={settings.READ_YOUR_WRITES_SECONDS}; "
+                    f"Path=/; HttpOnly; SameSite=Lax"
+                )
+                headers = MutableHeaders(scope=message)
+                headers.append("set-cookie", cookie)
+                headers.append(READ_YOUR_WRITES_HEADER, token)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+@asynccontextmanager
+async def read_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """
+    An async session for reads made on behalf of `request`.
+
+    Uses the replica when one is configured, unless the request carries a
+    valid read-your-writes token (cookie or header) from a recent write, or
+    the replica recently failed. If the
+    replica can't be reached the primary is used instead when
+    REPLICA_FALLBACK_TO_PRIMARY is set.
+    """
+    token = request.headers.get(READ_YOUR_WRITES_HEADER) or request.cookies.get(READ_YOUR_WRITES_COOKIE)
+    if read_router.replica_available() and not wrote_recently(token):
+        async with session.ReplicaSessionLocal() as db:
+            try:
+                await db.connection()
+            except (SQLAlchemyError, OSError) as e:
+                if not settings.REPLICA_FALLBACK_TO_PRIMARY:
+                    raise
+                logger.warning("Read replica unavailable, using primary: %s", e)
+                read_router.mark_replica_down()
+            else:
+                read_router.replica_reads += 1
+                yield db
+                return
+
+    read_router.primary_reads += 1
+    async with session.AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db(request: Request):
+    """
+    Get an async session for read-only handlers; see read_session.
+    Handlers that can often answer without the database should open
+    read_session themselves instead.
+    """
+    async with read_session(request) as db:
+        yield db
\ No newline at end of file
@@ -1,11 +1,33 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
+from app.db.metrics import instrumented_pool_class
 
-# Create SQLAlchemy engine
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+def _connect_args() -> dict:
+    if settings.DB_STATEMENT_TIMEOUT_MS is None:
+        return {}
+    return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+
+def _async_connect_args() -> dict:
+    if settings.DB_STATEMENT_TIMEOUT_MS is None:
+        return {}
+    return {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+
+# Create SQLAlchemy engine (sync; used by init_db.py and background jobs)
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=instrumented_pool_class(QueuePool, "primary"),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_connect_args(),
+)
 
 # Create SessionLocal class (factory for database sessions)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -16,4 +38,40 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Create the async engine used by the API endpoints
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_ASYNC_DATABASE_URI),
+    poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, "async"),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_async_connect_args(),
+)
+
+# Objects stay usable after commit; async code can't lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+# Optional read replica engine; None when no replica is configured
+replica_engine = None
+ReplicaSessionLocal = None
+if settings.SQLALCHEMY_REPLICA_DATABASE_URI:
+    replica_engine = create_async_engine(
+        str(settings.SQLALCHEMY_REPLICA_DATABASE_URI),
+        poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, "replica"),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_async_connect_args(),
+    )
+    ReplicaSessionLocal = async_sessionmaker(replica_engine, expire_on_commit=False, autoflush=False)
+
+# Function to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -1,31 +1,64 @@
+import time
+
+# Start of the startup-time measurement, taken before the heavy imports below
+IMPORT_STARTED = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import models
 from app.api.api_v1.api import api_router
 from app.core.config import settings
-from app.db.session import get_db, engine
-from app.db.base_class import Base
-from app.models import user, membership, seva, booking, page
+from app.core.rate_limit import RateLimitMiddleware, rate_limiter
+from app.core.startup import startup_timer
+from app.db.routing import READ_YOUR_WRITES_HEADER, ReadYourWritesMiddleware
+from app.db.session import get_async_db, async_engine
+from app.models import user, membership, seva, booking, page, member_import, seva_summary, idempotency_key
 from app.utils import security
 
-# Create all tables in the database
-Base.metadata.create_all(bind=engine)
+# The schema is managed by Alembic migrations (see init_db.py / `alembic upgrade head`);
+# importing this module does no database work
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.CHECK_SCHEMA_ON_STARTUP:
+        # Imported here so workers that skip the check don't load Alembic
+        from app.db.migrate import check_schema
+        async with async_engine.connect() as connection:
+            await connection.run_sync(check_schema)
+    startup_timer.finish(IMPORT_STARTED)
+    yield
+    await async_engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
+)
+
+# Remember recent writers so their reads skip the (possibly lagging) replica
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Reject over-limit calls to expensive endpoints before any work is done
+app.add_middleware(
+    RateLimitMiddleware,
+    limiter=rate_limiter,
+    trust_forwarded_for=settings.RATE_LIMIT_TRUST_FORWARDED_FOR,
 )
 
-# Set up CORS middleware
+# Set up CORS middleware (added last so it also wraps 429 responses)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # For production, replace with specific origins
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[READ_YOUR_WRITES_HEADER],
 )
 
 # Include API router
@@ -42,14 +75,17 @@ async def health_check():
 # Authentication endpoint
 @app.post(f"{settings.API_V1_STR}/auth/login", tags=["Authentication"])
 async def login(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = db.query(user.User).filter(user.User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.password_hash):
+    # The query is async and bcrypt runs on the hashing pool, so the
+    # event loop keeps serving other requests meanwhile
+    result = await db.execute(select(models.User).where(models.User.email == form_data.username))
+    db_user = result.scalars().first()
+    if not db_user or not await security.verify_password_async(form_data.password, db_user.password_hash):
         raise HTTPException(
             status_code=400,
             detail="Incorrect username or password"
@@ -57,39 +93,9 @@ async def login(
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        subject=user.id, expires_delta=access_token_expires
+        subject=db_user.id, expires_delta=access_token_expires
     )
     return {
         "access_token": access_token,
         "token_type": "bearer"
-    }
-
-# Optional: Data import endpoint for admin use
-@app.post(f"{settings.API_V1_STR}/admin/import-data", tags=["Administration"])
-async def import_data(
-    members_csv_path: str,
-    address_csv_path: str,
-    db: Session = Depends(get_db),
-    current_user: user.User = Depends(security.get_current_active_superuser)
-):
-    """
-    Import member data from CSV files (admin only)
-    """
-    from app.utils.import_data import import_members_from_csv
-    
-    try:
-        users_created, memberships_created, errors = import_members_from_csv(
-            db, members_csv_path, address_csv_path
-        )
-        
-        return {
-            "success": True,
-            "users_created": users_created,
-            "memberships_created": memberships_created,
-            "errors": errors
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error importing data: {str(e)}"
-        )
\ No newline at end of file
+    }
\ No newline at end of file
@@ -0,0 +1,10 @@
+from app.models.booking import Booking, BookingItem, PaymentStatus
+from app.models.idempotency_key import IdempotencyKey
+from app.models.member_import import MemberImport
+from app.models.membership import (
+    Gender, MaritalStatus, Math, MembershipType, MembershipStatus, Membership
+)
+from app.models.page import Page
+from app.models.seva import Seva, SevaSlot
+from app.models.seva_summary import SevaDailySummary
+from app.models.user import User, UserType
\ No newline at end of file
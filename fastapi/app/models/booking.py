@@ -1,5 +1,6 @@
-from sqlalchemy import Column, ForeignKey, String, Text, Numeric, Integer, DateTime, Enum
+from sqlalchemy import Column, ForeignKey, String, Text, Numeric, Integer, Date, DateTime, Enum, Index, inspect
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.base import NO_VALUE
 from sqlalchemy.sql import func
 import enum
 import uuid
@@ -15,6 +16,13 @@ class Booking(Base):
     """
     Booking model - represents a donation/booking transaction
     """
+    __table_args__ = (
+        # A user's bookings, newest first
+        Index("ix_booking_user_id_booking_date", "user_id", "booking_date"),
+        # Keyset pagination over all bookings
+        Index("ix_booking_booking_date_id", "booking_date", "id"),
+    )
+
     # User making the booking
     user_id = Column(ForeignKey("user.id"), nullable=False)
     user = relationship("User", backref="bookings")
@@ -32,7 +40,7 @@ class Booking(Base):
         default=PaymentStatus.PENDING
     )
     receipt_id = Column(String, nullable=True, unique=True)
-    payment_gateway_ref = Column(String, nullable=True)
+    payment_gateway_ref = Column(String, nullable=True, index=True)
     
     # Timestamp
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -45,13 +53,21 @@ class BookingItem(Base):
     BookingItem model - represents individual seva items within a booking
     """
     # Booking reference
-    booking_id = Column(ForeignKey("booking.id", ondelete="CASCADE"), nullable=False)
+    booking_id = Column(ForeignKey("booking.id", ondelete="CASCADE"), nullable=False, index=True)
     booking = relationship("Booking", back_populates="items")
     
     # Seva reference
-    seva_id = Column(ForeignKey("seva.id"), nullable=False)
+    seva_id = Column(ForeignKey("seva.id"), nullable=False, index=True)
     seva = relationship("Seva", back_populates="booking_items")
     
     # Details
     quantity = Column(Integer, nullable=False, default=1)
-    price_at_booking = Column(Numeric(10, 2), nullable=False)
\ No newline at end of file
+    price_at_booking = Column(Numeric(10, 2), nullable=False)
+    # Day the seva is performed; required for sevas with a daily capacity
+    slot_date = Column(Date, nullable=True)
+
+    @property
+    def seva_name(self):
+        """Name of the seva if it was eager-loaded; never triggers a query."""
+        seva = inspect(self).attrs.seva.loaded_value
+        return None if seva is NO_VALUE or seva is None else seva.name
\ No newline at end of file
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+class IdempotencyKey(Base):
+    """
+    IdempotencyKey model - the stored response for an Idempotency-Key,
+    used by the database idempotency store (IDEMPOTENCY_STORE=database)
+    """
+    key = Column(String, nullable=False, unique=True)
+    fingerprint = Column(String(64), nullable=False)
+    # Random token of the request holding the key, checked when it completes
+    claim_token = Column(String(32), nullable=True)
+
+    # Unset while the first request is still running
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
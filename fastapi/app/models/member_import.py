@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, ForeignKey, DateTime
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+class MemberImport(Base):
+    """
+    MemberImport model - links a member sheet row (MEMBER CODE) to the user
+    it was imported as, with a hash of the row's normalized content so
+    re-imports only touch rows that changed
+    """
+    member_code = Column(String, nullable=False, unique=True, index=True)
+    addr_code = Column(String, nullable=True)
+    content_hash = Column(String(16), nullable=False)
+
+    user_id = Column(ForeignKey("user.id", ondelete="CASCADE"), nullable=False, unique=True)
+    user = relationship("User")
+
+    # Timestamp
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, Enum, Date, DateTime
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, Enum, Date, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -32,6 +32,11 @@ class Membership(Base):
     """
     Membership model - represents detailed information for registered members
     """
+    __table_args__ = (
+        # Keyset pagination
+        Index("ix_membership_application_date_id", "application_date", "id"),
+    )
+
     user_id = Column(
         ForeignKey("user.id", ondelete="CASCADE"),
         unique=True,
@@ -69,7 +74,8 @@ class Membership(Base):
     status = Column(
         Enum(MembershipStatus, name="membership_status_enum"),
         nullable=False,
-        default=MembershipStatus.PENDING
+        default=MembershipStatus.PENDING,
+        index=True
     )
     application_date = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     approval_date = Column(DateTime(timezone=True), nullable=True)
\ No newline at end of file
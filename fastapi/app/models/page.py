@@ -1,23 +1,44 @@
-from sqlalchemy import Column, String, Text, ForeignKey, Boolean, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, ForeignKey, Boolean, DateTime, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 import uuid
 
 from app.db.base_class import Base
 
+# Text search configuration of Page.search_vector; queries must use the same
+SEARCH_CONFIG = "english"
+
 class Page(Base):
     """
     Page model - represents dynamic content pages for the website
     """
+    __table_args__ = (
+        # Keyset pagination
+        Index("ix_page_created_at_id", "created_at", "id"),
+        # Full-text search
+        Index("ix_page_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     # Page content
     title = Column(String, nullable=False)
     slug = Column(String, nullable=False, unique=True)
     content = Column(Text, nullable=False)
+    # Kept up to date by Postgres; title matches rank above content matches.
+    # Deferred, so only search queries load it
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(content, '')), 'B')",
+            persisted=True
+        )
+    ))
     
     # Meta information
     created_by = Column(ForeignKey("user.id"), nullable=False)
     author = relationship("User")
-    is_published = Column(Boolean, nullable=False, default=False)
+    is_published = Column(Boolean, nullable=False, default=False, index=True)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
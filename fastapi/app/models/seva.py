@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Numeric, Boolean
+from sqlalchemy import Column, String, Text, Numeric, Boolean, Integer, Date, ForeignKey, UniqueConstraint, CheckConstraint
 from sqlalchemy.orm import relationship
 import uuid
 
@@ -16,7 +16,33 @@ class Seva(Base):
     price = Column(Numeric(10, 2), nullable=False)
     
     # Status
-    is_active = Column(Boolean, nullable=False, default=True)
+    is_active = Column(Boolean, nullable=False, default=True, index=True)
+    
+    # Bookable quantity per day; None means unlimited
+    daily_capacity = Column(Integer, nullable=True)
     
     # Relationships
-    booking_items = relationship("BookingItem", back_populates="seva")
\ No newline at end of file
+    booking_items = relationship("BookingItem", back_populates="seva")
+
+class SevaSlot(Base):
+    """
+    SevaSlot model - capacity and reserved quantity of a capacity-limited
+    seva on one date. Reservations are conditional updates on this row
+    (see app.utils.inventory), so the check constraint never trips in
+    normal operation
+    """
+    __table_args__ = (
+        UniqueConstraint("seva_id", "slot_date", name="uq_sevaslot_seva_id_slot_date"),
+        CheckConstraint("reserved >= 0 AND reserved <= capacity", name="ck_sevaslot_reserved"),
+    )
+
+    seva_id = Column(ForeignKey("seva.id", ondelete="CASCADE"), nullable=False)
+    seva = relationship("Seva")
+    slot_date = Column(Date, nullable=False)
+
+    capacity = Column(Integer, nullable=False)
+    reserved = Column(Integer, nullable=False, default=0)
+
+    @property
+    def available(self) -> int:
+        return self.capacity - self.reserved
\ No newline at end of file
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, ForeignKey, Integer, Numeric, Date, Enum, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+from app.models.booking import PaymentStatus
+
+class SevaDailySummary(Base):
+    """
+    SevaDailySummary model - booked quantity and amount per seva, per day
+    (in REPORT_TIMEZONE) and payment status. Kept up to date in the same
+    transaction as the bookings that change it; see app.utils.revenue
+    """
+    __table_args__ = (
+        UniqueConstraint("seva_id", "summary_date", "payment_status", name="uq_sevadailysummary_key"),
+    )
+
+    seva_id = Column(ForeignKey("seva.id"), nullable=False)
+    seva = relationship("Seva")
+    summary_date = Column(Date, nullable=False, index=True)
+    payment_status = Column(Enum(PaymentStatus, name="payment_status_enum"), nullable=False)
+
+    # Totals
+    quantity = Column(Integer, nullable=False, default=0)
+    amount = Column(Numeric(12, 2), nullable=False, default=0)
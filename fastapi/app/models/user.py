@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Enum, DateTime
+from sqlalchemy import Column, String, Boolean, Enum, DateTime, Index
 from sqlalchemy.sql import func
 import enum
 import uuid
@@ -13,6 +13,11 @@ class User(Base):
     """
     User model - represents members, non-members, and administrators
     """
+    __table_args__ = (
+        # Keyset pagination
+        Index("ix_user_created_at_id", "created_at", "id"),
+    )
+
     # Basic user information
     first_name = Column(String, nullable=False)
     middle_name = Column(String, nullable=True)
@@ -0,0 +1,11 @@
+from app.schemas.booking import (
+    BookingItemBase, BookingItemCreate, BookingItem, BookingBase, BookingCreate, BookingUpdate, Booking,
+    PaymentOutcome, PaymentReconciliation, PaymentReconciliationResult
+)
+from app.schemas.job import Job
+from app.schemas.membership import MembershipBase, MembershipCreate, MembershipUpdate, Membership
+from app.schemas.page import PageBase, PageCreate, PageUpdate, Page, PageSearchResult
+from app.schemas.pagination import CursorPage
+from app.schemas.report import SevaRevenue, SevaRevenueTotal
+from app.schemas.seva import SevaBase, SevaCreate, SevaUpdate, Seva, SevaSlotUpdate, SevaSlot
+from app.schemas.user import UserBase, UserCreate, UserUpdate, User
\ No newline at end of file
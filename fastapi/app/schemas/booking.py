@@ -1,7 +1,7 @@
 from pydantic import BaseModel, validator, condecimal
 from typing import Optional, List
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime
 
 from app.models.booking import PaymentStatus
 
@@ -9,6 +9,8 @@ class BookingItemBase(BaseModel):
     seva_id: UUID
     quantity: int = 1
     price_at_booking: Optional[condecimal(decimal_places=2, ge=0)] = None
+    # Day the seva is performed; required for sevas with a daily capacity
+    slot_date: Optional[date] = None
 
     @validator('quantity')
     def validate_quantity(cls, v):
@@ -22,6 +24,8 @@ class BookingItemCreate(BookingItemBase):
 class BookingItem(BookingItemBase):
     id: UUID
     booking_id: UUID
+    # Only filled in when requested with include_seva=true
+    seva_name: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -44,6 +48,8 @@ class BookingBase(BaseModel):
         return v
 
 class BookingCreate(BookingBase):
+    # Computed by the server from the items and donation; accepted but ignored
+    total_amount: Optional[condecimal(decimal_places=2, ge=0)] = None
     items: Optional[List[BookingItemCreate]] = None
 
 class BookingUpdate(BaseModel):
@@ -60,4 +66,22 @@ class Booking(BookingBase):
     items: List[BookingItem] = []
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class PaymentOutcome(BaseModel):
+    payment_gateway_ref: str
+    payment_status: PaymentStatus
+    receipt_id: Optional[str] = None
+
+class PaymentReconciliation(BaseModel):
+    items: List[PaymentOutcome]
+
+class PaymentReconciliationResult(BaseModel):
+    received: int
+    matched: int
+    updated: int
+    # Gateway references with no booking
+    unmatched: List[str] = []
+    # References of FAILED bookings reported as not failed; these need a
+    # PUT /bookings/{id} so their slots are reserved again
+    skipped: List[str] = []
\ No newline at end of file
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from datetime import datetime
+
+from app.utils.jobs import JobStatus
+
+class Job(BaseModel):
+    id: UUID
+    kind: str
+    status: JobStatus
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    rows_processed: int = 0
+    error_count: int = 0
+    rows_per_second: float = 0.0
+    errors: List[str] = []
+    result: Optional[Dict[str, Any]] = None
+
+    class Config:
+        orm_mode = True
@@ -25,4 +25,14 @@ class Page(PageBase):
     updated_at: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class PageSearchResult(BaseModel):
+    id: UUID
+    title: str
+    slug: str
+    is_published: bool
+    updated_at: datetime
+    rank: float
+    # Matching fragments of the content, with matches wrapped in <mark></mark>
+    snippet: str
\ No newline at end of file
@@ -0,0 +1,9 @@
+from pydantic.generics import GenericModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class CursorPage(GenericModel, Generic[T]):
+    items: List[T]
+    # Pass back as ?cursor= to get the next page; None on the last page
+    next_cursor: Optional[str] = None
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+from datetime import date
+from decimal import Decimal
+
+from app.models.booking import PaymentStatus
+
+class SevaRevenue(BaseModel):
+    seva_id: UUID
+    seva_name: str
+    summary_date: date
+    payment_status: PaymentStatus
+    quantity: int
+    amount: Decimal
+
+class SevaRevenueTotal(BaseModel):
+    seva_id: UUID
+    seva_name: str
+    payment_status: PaymentStatus
+    quantity: int
+    amount: Decimal
@@ -1,12 +1,15 @@
-from pydantic import BaseModel, validator, condecimal
+from pydantic import BaseModel, validator, condecimal, conint
 from typing import Optional, List
 from uuid import UUID
+from datetime import date
 
 class SevaBase(BaseModel):
     name: str
     description: Optional[str] = None
     price: condecimal(decimal_places=2, ge=0)
     is_active: bool = True
+    # Bookable quantity per day; None means unlimited
+    daily_capacity: Optional[conint(ge=1)] = None
 
 class SevaCreate(SevaBase):
     pass
@@ -16,9 +19,23 @@ class SevaUpdate(BaseModel):
     description: Optional[str] = None
     price: Optional[condecimal(decimal_places=2, ge=0)] = None
     is_active: Optional[bool] = None
+    daily_capacity: Optional[conint(ge=1)] = None
 
 class Seva(SevaBase):
     id: UUID
 
+    class Config:
+        orm_mode = True
+
+class SevaSlotUpdate(BaseModel):
+    capacity: conint(ge=0)
+
+class SevaSlot(BaseModel):
+    seva_id: UUID
+    slot_date: date
+    capacity: int
+    reserved: int
+    available: int
+
     class Config:
         orm_mode = True
\ No newline at end of file
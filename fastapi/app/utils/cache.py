@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class TTLCache:
+    """
+    A thread-safe, size-bounded LRU cache whose entries expire after ttl
+    seconds. Hit and miss counts are kept for monitoring.
+
+    With weigh, e.g. len of a serialized body, the least recently used
+    entries are also evicted while the total weight exceeds maxweight.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        maxweight: Optional[int] = None,
+        weigh: Optional[Callable[[Any], int]] = None
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxweight = maxweight
+        self.weigh = weigh
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._pop(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._put(key, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+
+    def _put(self, key: Hashable, value: Any) -> None:
+        # Caller holds the lock
+        self._pop(key)
+        weight = self.weigh(value) if self.weigh else 0
+        if self.maxweight is not None and weight > self.maxweight:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value, weight)
+        self.weight += weight
+        while len(self._data) > self.maxsize or (
+            self.maxweight is not None and self.weight > self.maxweight
+        ):
+            self.weight -= self._data.popitem(last=False)[1][2]
+
+    def _pop(self, key: Hashable) -> None:
+        # Caller holds the lock
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.weight -= entry[2]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+            }
+            if self.weigh:
+                stats["weight"] = self.weight
+                stats["maxweight"] = self.maxweight
+            return stats
+
+class VersionedCache(TTLCache):
+    """
+    A TTLCache for data derived from tables that are rarely written.
+
+    Every write bumps the version and empties the cache. Readers take the
+    version before they query and only store what they loaded if it is
+    still current, so a read racing a write can never cache stale data.
+    For settle seconds after a write nothing is stored, which gives a read
+    replica time to catch up before its results are cached.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, settle: float = 0, **kwargs: Any):
+        super().__init__(maxsize, ttl, **kwargs)
+        self.settle = settle
+        self.version = 0
+        self._settled_at = 0.0
+
+    def set_if_current(self, key: Hashable, value: Any, version: int) -> bool:
+        with self._lock:
+            if version != self.version or time.monotonic() < self._settled_at:
+                return False
+            self._put(key, value)
+            return True
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._settled_at = time.monotonic() + self.settle
+            self._data.clear()
+            self.weight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["version"] = self.version
+        return stats
\ No newline at end of file
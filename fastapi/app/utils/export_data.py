@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import select
+
+from app import models
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+# Column layout of the committee's FINAL-MEMBER sheet
+MEMBER_CSV_COLUMNS = [
+    "MEMBER CODE", "TITLE", "FIRST NAME", "MIDDLE NAME", "SURNAME", "ADDR CODE",
+    "GENDER", "DATE OF BIRTH", "OCCUPATION", "QUALIFICATION", "MARITAL STATUS",
+    "NO OF CHILDREN", "GOTRA", "KULDEVTHA", "MATH", "NATIVE PLACE",
+    "Addhar Card Number", "PAN CARD NO", "INTRODUCER NAME", "DATE OF JOINING",
+]
+
+def _member_directory_query():
+    """Every user with their membership and member sheet codes, if any."""
+    User, Membership, MemberImport = models.User, models.Membership, models.MemberImport
+    return (
+        select(
+            User.id.label("user_id"),
+            User.first_name,
+            User.middle_name,
+            User.surname,
+            User.email,
+            User.mobile_no,
+            User.user_type,
+            User.created_at,
+            MemberImport.member_code,
+            MemberImport.addr_code,
+            Membership.gender,
+            Membership.postal_address,
+            Membership.pin_code,
+            Membership.date_of_birth,
+            Membership.occupation,
+            Membership.qualification,
+            Membership.marital_status,
+            Membership.number_of_kids,
+            Membership.gotra,
+            Membership.kuladevata,
+            Membership.math,
+            Membership.native_place,
+            Membership.other_gsb_memberships,
+            Membership.introducer_name,
+            Membership.membership_type,
+            Membership.status,
+            Membership.application_date,
+            Membership.approval_date,
+        )
+        .outerjoin(Membership, Membership.user_id == User.id)
+        .outerjoin(MemberImport, MemberImport.user_id == User.id)
+        .order_by(User.created_at, User.id)
+    )
+
+def _stream_rows(chunk_size: Optional[int] = None) -> Iterator[List[Any]]:
+    """
+    Yield the member directory in chunks of rows.
+
+    yield_per makes psycopg2 use a server-side cursor, so only one chunk is
+    held in memory at a time however many members there are.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    db = SessionLocal()
+    try:
+        result = db.execute(_member_directory_query().execution_options(yield_per=chunk_size))
+        for chunk in result.partitions():
+            yield chunk
+    finally:
+        db.close()
+
+def _format_date(value: Any) -> str:
+    return f"{value.month}/{value.day}/{value.year}" if value else ""
+
+def _enum_value(value: Any) -> str:
+    return value.value if value is not None else ""
+
+def _member_csv_row(row: Any) -> List[Any]:
+    return [
+        row.member_code or "",
+        "",  # TITLE is not stored
+        row.first_name,
+        row.middle_name or "",
+        row.surname,
+        row.addr_code or "",
+        _enum_value(row.gender),
+        _format_date(row.date_of_birth),
+        row.occupation or "",
+        row.qualification or "",
+        _enum_value(row.marital_status),
+        "" if row.number_of_kids is None else row.number_of_kids,
+        row.gotra or "",
+        row.kuladevata or "",
+        _enum_value(row.math),
+        row.native_place or "",
+        "",  # Aadhaar is not stored
+        "",  # PAN is stored per booking, not per member
+        row.introducer_name or "",
+        _format_date(row.approval_date or row.application_date),
+    ]
+
+def stream_members_csv(chunk_size: Optional[int] = None) -> Iterator[str]:
+    """Stream the member directory as CSV in the FINAL-MEMBER.csv layout."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(MEMBER_CSV_COLUMNS)
+    for chunk in _stream_rows(chunk_size):
+        writer.writerows(_member_csv_row(row) for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def stream_members_ndjson(chunk_size: Optional[int] = None) -> Iterator[str]:
+    """Stream the member directory as newline-delimited JSON, one user per line."""
+    for chunk in _stream_rows(chunk_size):
+        yield "".join(json.dumps(dict(row._mapping), default=str) + "\n" for row in chunk)
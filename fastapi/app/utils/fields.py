@@ -0,0 +1,82 @@
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import InstrumentedAttribute, load_only
+
+from app import schemas
+
+@lru_cache(maxsize=256)
+def _trimmed_schema(schema: Type[BaseModel], names: Tuple[str, ...]) -> Type[BaseModel]:
+    """A copy of schema with only the named fields, built once per selection."""
+    definitions = {}
+    for name in names:
+        field = schema.__fields__[name]
+        field_type = Optional[field.outer_type_] if field.allow_none else field.outer_type_
+        definitions[name] = (field_type, ... if field.required else field.default)
+    return create_model(f"{schema.__name__}Fields", __config__=schema.__config__, **definitions)
+
+class Fieldset:
+    """
+    The fields of a response schema a client asked for. The SQL query only
+    loads the matching columns and responses use a trimmed copy of the schema.
+    """
+
+    def __init__(self, schema: Type[BaseModel], names: Tuple[str, ...]):
+        self.names = names
+        self.schema = _trimmed_schema(schema, names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def load_only(self, model: Any, keys: Sequence[InstrumentedAttribute] = ()) -> Any:
+        """
+        A loader option for the selected columns of model, plus the sort keys
+        pagination reads from the last row. Fields that aren't columns, like
+        relationships, are left to the caller's other loader options.
+        """
+        columns = {attr.key for attr in inspect(model).column_attrs}
+        selected = [name for name in self.names if name in columns]
+        selected += [key.key for key in keys if key.key not in selected]
+        return load_only(*[getattr(model, name) for name in selected])
+
+    def page(self, result: Dict[str, Any]) -> BaseModel:
+        return schemas.CursorPage[self.schema].parse_obj(result)
+
+    def page_response(self, result: Dict[str, Any]) -> JSONResponse:
+        return JSONResponse(content=jsonable_encoder(self.page(result)))
+
+class FieldsParam:
+    """
+    The fields= query parameter of list endpoints: a comma-separated list of
+    fields to return. id is always included when the schema has one.
+    """
+
+    def __init__(
+        self,
+        fields: Optional[str] = Query(
+            None, description="Comma-separated fields to return, e.g. id,title; all fields when omitted"
+        ),
+    ):
+        self.fields = fields
+
+    def select(self, schema: Type[BaseModel]) -> Optional[Fieldset]:
+        """The requested Fieldset of schema, or None when all fields are wanted."""
+        if not self.fields:
+            return None
+        requested = {name.strip() for name in self.fields.split(",") if name.strip()}
+        unknown = requested - set(schema.__fields__)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+                       f"Available fields: {', '.join(schema.__fields__)}"
+            )
+        if "id" in schema.__fields__:
+            requested.add("id")
+        # Schema order, so equal selections share a trimmed schema and cache key
+        return Fieldset(schema, tuple(name for name in schema.__fields__ if name in requested))
\ No newline at end of file
@@ -0,0 +1,343 @@
+import abc
+import asyncio
+import hashlib
+import json
+import logging
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, Union
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import session
+from app.models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: Any
+
+@dataclass
+class Claim:
+    """A key claimed by begin(); only its holder can complete or release it."""
+    key: str
+    fingerprint: str
+    token: str
+
+class IdempotencyConflict(Exception):
+    """The key is in use by a request with a different body."""
+
+class IdempotencyInProgress(Exception):
+    """The first request with this key didn't finish within the wait time."""
+
+class IdempotencyStore(abc.ABC):
+    """
+    Remembers the response to each idempotency key for IDEMPOTENCY_TTL_SECONDS.
+
+    begin() either claims the key for the caller (returns a Claim), in which
+    case the caller must later complete() or release() it, or returns the
+    stored response of an earlier request with the same key. Duplicates
+    arriving while the first request runs wait for it to finish.
+    """
+
+    # Seconds a claim is held unless renewed; None when claims never expire
+    lease: Optional[float] = None
+
+    @abc.abstractmethod
+    async def begin(self, key: str, fingerprint: str) -> Union[Claim, StoredResponse]:
+        ...
+
+    async def renew(self, claim: Claim) -> bool:
+        """Extend the claim's lease; False if it has been taken over."""
+        return True
+
+    @abc.abstractmethod
+    async def complete(self, claim: Claim, response: StoredResponse) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def release(self, claim: Claim) -> None:
+        ...
+
+@dataclass
+class _MemoryEntry:
+    fingerprint: str
+    token: str
+    done: asyncio.Event
+    expires_at: float
+    response: Optional[StoredResponse] = None
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Per-worker store; only safe when a single worker serves the API."""
+
+    def __init__(self, ttl: float, wait: float):
+        self.ttl = ttl
+        self.wait = wait
+        self._entries: Dict[str, _MemoryEntry] = {}
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if e.response and e.expires_at <= now]:
+            del self._entries[key]
+
+    def _held(self, claim: Claim) -> Optional[_MemoryEntry]:
+        entry = self._entries.get(claim.key)
+        if entry and entry.token == claim.token and entry.fingerprint == claim.fingerprint:
+            return entry
+        return None
+
+    async def begin(self, key: str, fingerprint: str) -> Union[Claim, StoredResponse]:
+        self._prune()
+        deadline = time.monotonic() + self.wait
+        while True:
+            entry = self._entries.get(key)
+            if entry is None:
+                claim = Claim(key, fingerprint, secrets.token_hex(16))
+                self._entries[key] = _MemoryEntry(fingerprint, claim.token, asyncio.Event(), time.monotonic() + self.ttl)
+                return claim
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyConflict()
+            if entry.response is not None:
+                return entry.response
+            # Wait for the first request, then look again (it may have released the key)
+            try:
+                await asyncio.wait_for(entry.done.wait(), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                raise IdempotencyInProgress()
+
+    async def complete(self, claim: Claim, response: StoredResponse) -> None:
+        entry = self._held(claim)
+        if entry is None:
+            return
+        entry.response = response
+        entry.expires_at = time.monotonic() + self.ttl
+        entry.done.set()
+
+    async def release(self, claim: Claim) -> None:
+        entry = self._held(claim)
+        if entry and entry.response is None:
+            del self._entries[claim.key]
+            entry.done.set()
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """
+    Store shared by all workers, in the idempotencykey table. Claims are
+    committed straight away in their own session; duplicates poll until
+    the first request completes.
+
+    A claim is a lease of IDEMPOTENCY_LEASE_SECONDS that idempotent_call
+    renews while the request runs, so only a claim left behind by a crashed
+    worker expires and can be taken over. Each claim carries a random token,
+    and completing or releasing a key only touches the row while it still
+    holds that token.
+    """
+
+    POLL_SECONDS = 0.1
+    # Expired rows are deleted on every this many completed requests
+    PURGE_EVERY = 100
+
+    def __init__(self, ttl: float, wait: float, lease: float):
+        self.ttl = ttl
+        self.wait = wait
+        self.lease = lease
+        self._completed = 0
+
+    def _held(self, claim: Claim) -> Tuple[Any, ...]:
+        return (
+            IdempotencyKey.key == claim.key,
+            IdempotencyKey.fingerprint == claim.fingerprint,
+            IdempotencyKey.claim_token == claim.token,
+            IdempotencyKey.status_code.is_(None),
+        )
+
+    async def begin(self, key: str, fingerprint: str) -> Union[Claim, StoredResponse]:
+        deadline = time.monotonic() + self.wait
+        while True:
+            now = datetime.now(timezone.utc)
+            claim = Claim(key, fingerprint, secrets.token_hex(16))
+            claim_expires = now + timedelta(seconds=self.lease)
+            async with session.AsyncSessionLocal() as db:
+                result = await db.execute(
+                    pg_insert(IdempotencyKey)
+                    .values(key=key, fingerprint=fingerprint, claim_token=claim.token, expires_at=claim_expires)
+                    .on_conflict_do_nothing(index_elements=["key"])
+                    .returning(IdempotencyKey.id)
+                )
+                claimed = result.first() is not None
+                if not claimed:
+                    # Take over an expired record (finished or abandoned)
+                    result = await db.execute(
+                        update(IdempotencyKey)
+                        .where(IdempotencyKey.key == key, IdempotencyKey.expires_at <= now)
+                        .values(
+                            fingerprint=fingerprint,
+                            claim_token=claim.token,
+                            status_code=None,
+                            response_body=None,
+                            expires_at=claim_expires,
+                        )
+                        .returning(IdempotencyKey.id)
+                    )
+                    claimed = result.first() is not None
+                await db.commit()
+                if claimed:
+                    return claim
+
+                record = (await db.execute(
+                    select(IdempotencyKey).where(IdempotencyKey.key == key)
+                )).scalars().first()
+            if record is not None:
+                if record.fingerprint != fingerprint:
+                    raise IdempotencyConflict()
+                if record.status_code is not None:
+                    return StoredResponse(record.status_code, json.loads(record.response_body))
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgress()
+            await asyncio.sleep(self.POLL_SECONDS)
+
+    async def renew(self, claim: Claim) -> bool:
+        async with session.AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(IdempotencyKey)
+                .where(*self._held(claim))
+                .values(expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.lease))
+                .returning(IdempotencyKey.id)
+            )
+            renewed = result.first() is not None
+            await db.commit()
+        return renewed
+
+    async def complete(self, claim: Claim, response: StoredResponse) -> None:
+        async with session.AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(IdempotencyKey)
+                .where(*self._held(claim))
+                .values(
+                    status_code=response.status_code,
+                    response_body=json.dumps(response.body),
+                    expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.ttl),
+                )
+                .returning(IdempotencyKey.id)
+            )
+            if result.first() is None:
+                logger.warning("Idempotency key %s was taken over before its response was stored", claim.key)
+            self._completed += 1
+            if self._completed % self.PURGE_EVERY == 0:
+                await db.execute(
+                    delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now(timezone.utc))
+                )
+            await db.commit()
+
+    async def release(self, claim: Claim) -> None:
+        async with session.AsyncSessionLocal() as db:
+            await db.execute(delete(IdempotencyKey).where(*self._held(claim)))
+            await db.commit()
+
+def _make_store() -> IdempotencyStore:
+    if settings.IDEMPOTENCY_STORE == "database":
+        return DatabaseIdempotencyStore(
+            settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_WAIT_SECONDS, settings.IDEMPOTENCY_LEASE_SECONDS
+        )
+    return InMemoryIdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_WAIT_SECONDS)
+
+idempotency_store = _make_store()
+
+def request_fingerprint(payload: BaseModel) -> str:
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+async def _keep_claim(claim: Claim) -> None:
+    """Renew the claim a few times per lease for as long as its request runs."""
+    while True:
+        await asyncio.sleep(idempotency_store.lease / 3)
+        try:
+            if not await idempotency_store.renew(claim):
+                logger.warning("Lost the claim on idempotency key %s while its request was running", claim.key)
+                return
+        except Exception:
+            logger.exception("Failed to renew the claim on idempotency key %s", claim.key)
+
+async def _finish(renewal: Optional[asyncio.Task], step: Awaitable[None]) -> None:
+    """Stop renewing the claim, then run step to the end even if the request is cancelled."""
+    if renewal:
+        renewal.cancel()
+    await asyncio.shield(step)
+
+async def idempotent_call(
+    idempotency_key: Optional[str],
+    scope: str,
+    payload: BaseModel,
+    response_model: Type[BaseModel],
+    db: AsyncSession,
+    call: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Run `call` at most once per Idempotency-Key within `scope` (e.g. the
+    endpoint and user), replaying the stored response for repeats.
+
+    Without a key `call` just runs. If it raises before committing `db`, the
+    key is released so the client can retry. Once it has committed, the key
+    is completed even if the request then fails or is cancelled (with a 500
+    when there is no response to store), so a retry never repeats the work.
+    """
+    if not idempotency_key:
+        return await call()
+    if len(idempotency_key) > 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+    key = f"{scope}:{idempotency_key}"
+    try:
+        claim = await idempotency_store.begin(key, request_fingerprint(payload))
+    except IdempotencyConflict:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request body"
+        )
+    except IdempotencyInProgress:
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still being processed"
+        )
+    if isinstance(claim, StoredResponse):
+        return JSONResponse(
+            content=claim.body,
+            status_code=claim.status_code,
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    committed = False
+
+    def on_commit(_session) -> None:
+        nonlocal committed
+        committed = True
+
+    event.listen(db.sync_session, "after_commit", on_commit)
+    renewal = asyncio.create_task(_keep_claim(claim)) if idempotency_store.lease else None
+    try:
+        result = await call()
+        response = StoredResponse(200, jsonable_encoder(response_model.from_orm(result)))
+    except BaseException:
+        if not committed:
+            await _finish(renewal, idempotency_store.release(claim))
+            raise
+        response = StoredResponse(500, {
+            "detail": "The request was processed but its response was lost; "
+                      "it will not be repeated for this Idempotency-Key"
+        })
+        await _finish(renewal, idempotency_store.complete(claim, response))
+        raise
+    finally:
+        event.remove(db.sync_session, "after_commit", on_commit)
+    await _finish(renewal, idempotency_store.complete(claim, response))
+    return JSONResponse(content=response.body)
\ No newline at end of file
@@ -1,33 +1,203 @@
 import csv
 import os
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from uuid import UUID, uuid4
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from app import models, schemas
+from app.core.config import settings
 from app.models.user import UserType
 from app.models.membership import Gender, MaritalStatus, Math, MembershipType, MembershipStatus
+from app.utils.security import invalidate_cached_user
 
-def parse_date(date_str: str) -> Optional[datetime]:
-    """Parse date string into datetime object."""
-    if not date_str or date_str == "":
-        return None
-    
-    formats = [
-        "%m/%d/%Y",  # MM/DD/YYYY
-        "%d/%m/%Y",  # DD/MM/YYYY
-        "%Y-%m-%d",  # YYYY-MM-DD
-    ]
-    
-    for fmt in formats:
-        try:
-            return datetime.strptime(date_str, fmt)
-        except ValueError:
+# Values the committee's spreadsheets use for "no data"
+MISSING_VALUES = ["", "#N/A"]
+
+DATE_FORMATS = [
+    "%m/%d/%Y",  # MM/DD/YYYY
+    "%d/%m/%Y",  # DD/MM/YYYY
+    "%Y-%m-%d",  # YYYY-MM-DD
+]
+
+EMAIL_COLUMNS = ['EMAIL-1', 'EMAIL-2', 'EMAIL-3', 'EMAIL-4']
+MOBILE_COLUMNS = ['MOBILE', 'MOBILE 1', 'MOBILE 2', 'MOBILE 3', 'MOBILE 4']
+ADDRESS_COLUMNS = ['BLDG NAME', 'WING & FLAT NO', 'DETAILED ADDRESS', 'LOCATION']
+
+USER_COLUMNS = [
+    "first_name", "middle_name", "surname", "email", "mobile_no", "user_type", "is_admin",
+]
+MEMBERSHIP_COLUMNS = [
+    "gender", "postal_address", "pin_code", "date_of_birth", "occupation",
+    "qualification", "marital_status", "gotra", "kuladevata", "math",
+    "native_place", "introducer_name", "membership_type", "status",
+    "application_date", "approval_date",
+]
+
+def read_csv_frame(csv_path: str) -> pd.DataFrame:
+    """
+    Read a CSV file as a frame of strings.
+
+    Like csv.DictReader, the last of any duplicated column names wins (the
+    address sheet repeats MOBILE and EMAIL-n), short rows are padded with
+    empty values and fields beyond the header are ignored.
+    """
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        header = next(csv.reader(f), [])
+    # Fixed positional columns, so ragged rows don't fail to parse
+    columns = range(len(header))
+    frame = pd.read_csv(
+        csv_path, dtype=str, keep_default_na=False, encoding='utf-8',
+        header=0, names=columns, usecols=columns
+    )
+    frame.columns = header
+    return frame.loc[:, ~frame.columns.duplicated(keep="last")]
+
+def _column(frame: pd.DataFrame, name: str) -> pd.Series:
+    """Return a column as strings, or empty strings if the sheet lacks it."""
+    if name in frame:
+        return frame[name].fillna("")
+    return pd.Series("", index=frame.index)
+
+def _present(frame: pd.DataFrame, name: str) -> pd.Series:
+    """Return a column with missing values as NaN."""
+    column = _column(frame, name)
+    return column.mask(column.isin(MISSING_VALUES))
+
+def _first_present(columns: List[pd.Series]) -> pd.Series:
+    """Pick the first non-missing value across columns, row by row."""
+    return pd.concat(columns, axis=1).bfill(axis=1).iloc[:, 0]
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """Parse a column of date strings, trying each of DATE_FORMATS in turn."""
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS:
+        parsed = parsed.fillna(pd.to_datetime(values, format=fmt, errors="coerce"))
+    return parsed
+
+def normalize_members(members: pd.DataFrame, addresses: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize member and address sheets into one clean frame.
+
+    The result has one row per member row with member_code, addr_code, an
+    error column (None for importable rows) and the USER_COLUMNS and
+    MEMBERSHIP_COLUMNS ready to be inserted. All work is done column-wise.
+    """
+    addr_codes = _column(addresses, 'ADDR CODE')
+    addresses = addresses[addr_codes != ""].drop_duplicates('ADDR CODE', keep="last")
+    wanted = [c for c in EMAIL_COLUMNS + MOBILE_COLUMNS + ADDRESS_COLUMNS + ['PINCODE'] if c in addresses]
+    addresses = addresses.set_index('ADDR CODE')[wanted]
+
+    member_code = _column(members, 'MEMBER CODE')
+    addr_code = _column(members, 'ADDR CODE')
+    addr = addresses.reindex(addr_code.values)
+    addr.index = members.index
+
+    email = _first_present([_present(addr, c) for c in EMAIL_COLUMNS])
+    mobile = _first_present([
+        _present(addr, c).str.replace(',', '', regex=False)
+                         .str.replace(' ', '', regex=False)
+                         .str.extract(r'(\d{10})', expand=False)
+        for c in MOBILE_COLUMNS
+    ])
+
+    postal_address = None
+    for c in ADDRESS_COLUMNS:
+        part = _present(addr, c).str.strip()
+        if postal_address is None:
+            postal_address = part
+        else:
+            # object keeps .str usable when every row is missing both
+            postal_address = postal_address.str.cat(part, sep=", ").fillna(postal_address).fillna(part).astype(object)
+
+    first_name = _column(members, 'FIRST NAME')
+    surname = _column(members, 'SURNAME')
+
+    error = pd.Series(np.select(
+        [
+            member_code == "",
+            email.isna() & mobile.isna(),
+            (first_name == "") | (surname == ""),
+        ],
+        [
+            "Missing MEMBER CODE in row",
+            "No valid email or mobile for member " + member_code,
+            "Missing name information for member " + member_code,
+        ],
+        default="",
+    ), index=members.index).replace("", None)
+
+    # Left as NaT when missing so the row's content hash stays stable
+    joined = parse_dates(_column(members, 'DATE OF JOINING'))
+
+    def or_not_provided(name: str) -> pd.Series:
+        return _column(members, name).replace("", "Not provided")
+
+    frame = pd.DataFrame({
+        "member_code": member_code,
+        "addr_code": addr_code,
+        "error": error,
+        # Users
+        "first_name": first_name,
+        "middle_name": _column(members, 'MIDDLE NAME'),
+        "surname": surname,
+        # Create a unique but deterministic email for users without one
+        "email": email.fillna("member" + member_code + "@placeholder.gsb"),
+        "mobile_no": mobile.fillna("0000000000"),  # Placeholder if no mobile
+        "user_type": UserType.MEMBER,
+        "is_admin": False,
+        # Memberships
+        "gender": (_column(members, 'GENDER') == 'MALE').map({True: Gender.MALE, False: Gender.FEMALE}),
+        "postal_address": postal_address.fillna("Address not provided"),
+        "pin_code": _present(addr, 'PINCODE').fillna("400000"),  # Default for Mumbai
+        "date_of_birth": parse_dates(_column(members, 'DATE OF BIRTH')).fillna(pd.Timestamp(1900, 1, 1)),
+        "occupation": or_not_provided('OCCUPATION'),
+        "qualification": or_not_provided('QUALIFICATION'),
+        "marital_status": MaritalStatus.MARRIED,  # Default
+        "gotra": or_not_provided('GOTRA'),
+        "kuladevata": or_not_provided('KULDEVTHA'),
+        "math": Math.KASHI,  # Default
+        "native_place": or_not_provided('NATIVE PLACE'),
+        "introducer_name": _column(members, 'INTRODUCER NAME'),
+        "membership_type": MembershipType.PATRON,
+        "status": MembershipStatus.APPROVED,
+        "application_date": joined,
+        "approval_date": joined,
+    }, index=members.index)
+    return frame
+
+def load_member_frame(members_csv_path: str, address_csv_path: str) -> pd.DataFrame:
+    """Read both CSV files and return the normalized member frame."""
+    return normalize_members(read_csv_frame(members_csv_path), read_csv_frame(address_csv_path))
+
+def content_hashes(frame: pd.DataFrame) -> pd.Series:
+    """Hash each normalized row's importable content as 16 hex digits."""
+    hashes = pd.util.hash_pandas_object(frame[["addr_code"] + USER_COLUMNS + MEMBERSHIP_COLUMNS], index=False)
+    return hashes.map("{:016x}".format)
+
+def iter_member_records(frame: pd.DataFrame):
+    """
+    Yield (member_code, error, user, membership) for each normalized row.
+
+    user and membership are column dictionaries; the membership has no
+    user_id yet. Both are None for rows with an error.
+    """
+    for record in frame.to_dict("records"):
+        if record["error"]:
+            yield record["member_code"], record["error"], None, None
             continue
-    
-    return None
+        user = {c: record[c] for c in USER_COLUMNS}
+        membership = {c: record[c] for c in MEMBERSHIP_COLUMNS}
+        membership["date_of_birth"] = membership["date_of_birth"].date()
+        joined = membership["application_date"]
+        joined = datetime.now() if pd.isna(joined) else joined.to_pydatetime()
+        membership["application_date"] = joined
+        membership["approval_date"] = joined
+        yield record["member_code"], None, user, membership
 
 def import_members_from_csv(
     db: Session,
@@ -36,154 +206,285 @@ def import_members_from_csv(
 ) -> Tuple[int, int, List[str]]:
     """
     Import member data from CSV files.
-    
+
     Args:
         db: Database session
         members_csv_path: Path to the members CSV file
         address_csv_path: Path to the address CSV file
-        
+
     Returns:
         Tuple containing (users_created, memberships_created, errors)
     """
-    # Load address data into a dictionary for lookup
-    address_data = {}
-    with open(address_csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            addr_code = row.get('ADDR CODE', '')
-            if addr_code:
-                address_data[addr_code] = row
-    
+    # Normalize both sheets up front, column by column
+    frame = load_member_frame(members_csv_path, address_csv_path)
+
     # Process member data
     users_created = 0
     memberships_created = 0
     errors = []
-    
-    with open(members_csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        
-        for row in reader:
-            try:
-                # Extract user data
-                member_code = row.get('MEMBER CODE', '')
-                if not member_code:
-                    errors.append(f"Missing MEMBER CODE in row")
-                    continue
-                
-                # Generate email if not available
-                addr_code = row.get('ADDR CODE', '')
-                email = None
-                mobile = None
-                
-                if addr_code in address_data:
-                    addr = address_data[addr_code]
-                    # Try to get email (multiple columns may have it)
-                    for email_col in ['EMAIL-1', 'EMAIL-2', 'EMAIL-3', 'EMAIL-4']:
-                        if email_col in addr and addr[email_col] and addr[email_col] != "#N/A":
-                            email = addr[email_col]
-                            break
-                    
-                    # Try to get mobile (multiple columns may have it)
-                    for mobile_col in ['MOBILE', 'MOBILE 1', 'MOBILE 2', 'MOBILE 3', 'MOBILE 4']:
-                        if mobile_col in addr and addr[mobile_col] and addr[mobile_col] != "#N/A":
-                            # Clean mobile number
-                            mobile_raw = addr[mobile_col]
-                            # Extract first numeric part that's 10 digits
-                            import re
-                            mobile_match = re.search(r'(\d{10})', mobile_raw.replace(',', '').replace(' ', ''))
-                            if mobile_match:
-                                mobile = mobile_match.group(1)
-                                break
-                
-                # Skip if we can't find an email or mobile
-                if not email and not mobile:
-                    errors.append(f"No valid email or mobile for member {member_code}")
-                    continue
-                
-                # Create a unique but deterministic email for users without one
-                if not email:
-                    email = f"member{member_code}@placeholder.gsb"
-                
-                # Create user
-                first_name = row.get('FIRST NAME', '')
-                middle_name = row.get('MIDDLE NAME', '')
-                surname = row.get('SURNAME', '')
-                
-                if not first_name or not surname:
-                    errors.append(f"Missing name information for member {member_code}")
-                    continue
-                
-                # Check if user already exists
-                existing_user = db.query(models.User).filter(models.User.email == email).first()
-                if existing_user:
-                    errors.append(f"User with email {email} already exists")
-                    continue
-                
-                user = models.User(
-                    first_name=first_name,
-                    middle_name=middle_name,
-                    surname=surname,
-                    email=email,
-                    mobile_no=mobile if mobile else "0000000000",  # Placeholder if no mobile
-                    user_type=UserType.MEMBER,
-                    is_admin=False
-                )
-                db.add(user)
-                db.flush()  # To get the user.id
-                users_created += 1
-                
-                # Create membership
-                gender_str = row.get('GENDER', '')
-                gender = Gender.MALE if gender_str == 'MALE' else Gender.FEMALE
-                
-                dob_str = row.get('DATE OF BIRTH', '')
-                dob = parse_date(dob_str)
-                
-                # Get address details
-                postal_address = ""
-                pin_code = "400000"  # Default for Mumbai
-                
-                if addr_code in address_data:
-                    addr = address_data[addr_code]
-                    address_parts = []
-                    
-                    # Compile address from parts
-                    for field in ['BLDG NAME', 'WING & FLAT NO', 'DETAILED ADDRESS', 'LOCATION']:
-                        if field in addr and addr[field] and addr[field] != "#N/A":
-                            address_parts.append(addr[field].strip())
-                    
-                    postal_address = ", ".join(address_parts)
-                    
-                    if 'PINCODE' in addr and addr['PINCODE'] and addr['PINCODE'] != "#N/A":
-                        pin_code = addr['PINCODE']
-                
-                # Create membership with available data
-                membership = models.Membership(
-                    user_id=user.id,
-                    gender=gender,
-                    postal_address=postal_address if postal_address else "Address not provided",
-                    pin_code=pin_code,
-                    date_of_birth=dob if dob else datetime(1900, 1, 1),  # Default date
-                    occupation=row.get('OCCUPATION', '') or "Not provided",
-                    qualification=row.get('QUALIFICATION', '') or "Not provided",
-                    marital_status=MaritalStatus.MARRIED,  # Default
-                    gotra=row.get('GOTRA', '') or "Not provided",
-                    kuladevata=row.get('KULDEVTHA', '') or "Not provided",
-                    math=Math.KASHI,  # Default
-                    native_place=row.get('NATIVE PLACE', '') or "Not provided",
-                    introducer_name=row.get('INTRODUCER NAME', ''),
-                    membership_type=MembershipType.PATRON,
-                    status=MembershipStatus.APPROVED,
-                    application_date=parse_date(row.get('DATE OF JOINING', '')) or datetime.now(),
-                    approval_date=parse_date(row.get('DATE OF JOINING', '')) or datetime.now(),
-                )
-                db.add(membership)
-                memberships_created += 1
-                
-            except Exception as e:
-                errors.append(f"Error processing member {row.get('MEMBER CODE', 'unknown')}: {str(e)}")
-    
+
+    for member_code, error, user_data, membership_data in iter_member_records(frame):
+        if error:
+            errors.append(error)
+            continue
+        try:
+            # Check if user already exists
+            email = user_data["email"]
+            existing_user = db.query(models.User).filter(models.User.email == email).first()
+            if existing_user:
+                errors.append(f"User with email {email} already exists")
+                continue
+
+            user = models.User(**user_data)
+            db.add(user)
+            db.flush()  # To get the user.id
+            users_created += 1
+
+            # Create membership with available data
+            membership = models.Membership(user_id=user.id, **membership_data)
+            db.add(membership)
+            memberships_created += 1
+
+        except Exception as e:
+            errors.append(f"Error processing member {member_code or 'unknown'}: {str(e)}")
+
     # Commit changes to database
     db.commit()
-    
-    return users_created, memberships_created, errors
\ No newline at end of file
+
+    return users_created, memberships_created, errors
+
+def bulk_import_members_from_csv(
+    db: Session,
+    members_csv_path: str,
+    address_csv_path: str,
+    batch_size: Optional[int] = None,
+    progress: Optional[Callable[[int, List[str]], None]] = None
+) -> Tuple[int, int, List[str]]:
+    """
+    Import member data from CSV files using set-based inserts.
+
+    Existing emails are loaded once up front, user ids are generated on the
+    client and users and memberships are inserted with one executemany per
+    batch, committing after every batch. A failed batch is rolled back and
+    reported; batches committed before it are kept.
+
+    If given, progress is called after every batch with the number of CSV
+    rows read so far and the errors collected so far. It may raise to stop
+    the import; batches committed until then are kept.
+
+    Args:
+        db: Database session
+        members_csv_path: Path to the members CSV file
+        address_csv_path: Path to the address CSV file
+        batch_size: Rows per insert/commit (defaults to IMPORT_BATCH_SIZE)
+        progress: Optional callback taking (rows_processed, errors)
+
+    Returns:
+        Tuple containing (users_created, memberships_created, errors)
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    frame = load_member_frame(members_csv_path, address_csv_path)
+
+    # One query for every email we already have
+    seen_emails = set(db.scalars(select(models.User.email)))
+
+    users_created = 0
+    memberships_created = 0
+    rows_processed = 0
+    errors = []
+    user_rows: List[Dict[str, Any]] = []
+    membership_rows: List[Dict[str, Any]] = []
+
+    def flush_batch() -> None:
+        nonlocal users_created, memberships_created
+        if not user_rows:
+            return
+        try:
+            db.execute(insert(models.User), user_rows)
+            db.execute(insert(models.Membership), membership_rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            errors.append(f"Error inserting batch of {len(user_rows)} members: {str(e)}")
+        else:
+            users_created += len(user_rows)
+            memberships_created += len(membership_rows)
+        user_rows.clear()
+        membership_rows.clear()
+        if progress:
+            progress(rows_processed, errors)
+
+    for member_code, error, user_data, membership_data in iter_member_records(frame):
+        rows_processed += 1
+        if error:
+            errors.append(error)
+            continue
+
+        email = user_data["email"]
+        if email in seen_emails:
+            errors.append(f"User with email {email} already exists")
+            continue
+        seen_emails.add(email)
+
+        user_id = uuid4()
+        user_rows.append({"id": user_id, **user_data})
+        membership_rows.append({"id": uuid4(), "user_id": user_id, **membership_data})
+
+        if len(user_rows) >= batch_size:
+            flush_batch()
+
+    flush_batch()
+    if progress:
+        progress(rows_processed, errors)
+
+    return users_created, memberships_created, errors
+
+
+# Columns an incremental re-import may change on existing rows. Admin-managed
+# fields (is_admin, membership status/type, approval dates) are left alone.
+USER_UPDATE_COLUMNS = ["first_name", "middle_name", "surname", "email", "mobile_no"]
+MEMBERSHIP_UPDATE_COLUMNS = [
+    "gender", "postal_address", "pin_code", "date_of_birth", "occupation",
+    "qualification", "gotra", "kuladevata", "native_place", "introducer_name",
+]
+
+def _upsert(db: Session, model: Any, rows: List[Dict[str, Any]], key: str, update_columns: List[str]) -> None:
+    """INSERT ... ON CONFLICT (key) DO UPDATE for a batch of rows."""
+    stmt = pg_insert(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_={c: stmt.excluded[c] for c in update_columns},
+    )
+    db.execute(stmt, rows)
+
+def incremental_import_members_from_csv(
+    db: Session,
+    members_csv_path: str,
+    address_csv_path: str,
+    batch_size: Optional[int] = None,
+    progress: Optional[Callable[[int, List[str]], None]] = None
+) -> Tuple[int, int, int, List[str]]:
+    """
+    Re-import member data, applying only rows that changed since last time.
+
+    Each MEMBER CODE is stored with the user it maps to and a hash of its
+    normalized content (including the joined ADDR CODE row). Rows whose
+    hash is unchanged are skipped; new and changed rows are upserted with
+    INSERT ... ON CONFLICT DO UPDATE in batches. A member code seen for the
+    first time whose email already belongs to an unlinked user is linked to
+    that user rather than reported as a duplicate. Users that change are
+    dropped from this worker's user cache once their batch commits.
+
+    Args:
+        db: Database session
+        members_csv_path: Path to the members CSV file
+        address_csv_path: Path to the address CSV file
+        batch_size: Rows per upsert/commit (defaults to IMPORT_BATCH_SIZE)
+        progress: Optional callback taking (rows_processed, errors)
+
+    Returns:
+        Tuple containing (created, updated, unchanged, errors)
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    frame = load_member_frame(members_csv_path, address_csv_path)
+    frame["content_hash"] = content_hashes(frame)
+
+    # Two queries for everything we need to know about the current state
+    known = {
+        code: (user_id, content_hash)
+        for code, user_id, content_hash in db.execute(select(
+            models.MemberImport.member_code,
+            models.MemberImport.user_id,
+            models.MemberImport.content_hash,
+        ))
+    }
+    user_ids_by_email = dict(db.execute(select(models.User.email, models.User.id)).all())
+    linked_user_ids = {user_id for user_id, _ in known.values()}
+
+    created = 0
+    updated = 0
+    unchanged = 0
+    rows_processed = 0
+    errors = []
+    seen_codes = set()
+    pending = 0
+    user_rows: List[Dict[str, Any]] = []
+    membership_rows: List[Dict[str, Any]] = []
+    link_rows: List[Dict[str, Any]] = []
+
+    def flush_batch() -> None:
+        nonlocal created, updated, pending
+        if not link_rows:
+            return
+        try:
+            _upsert(db, models.User, user_rows, "id", USER_UPDATE_COLUMNS)
+            _upsert(db, models.Membership, membership_rows, "user_id", MEMBERSHIP_UPDATE_COLUMNS)
+            _upsert(db, models.MemberImport, link_rows, "member_code", ["addr_code", "content_hash", "user_id"])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            errors.append(f"Error upserting batch of {len(link_rows)} members: {str(e)}")
+        else:
+            for row in user_rows:
+                invalidate_cached_user(row["id"])
+            updated += pending
+            created += len(link_rows) - pending
+        pending = 0
+        user_rows.clear()
+        membership_rows.clear()
+        link_rows.clear()
+        if progress:
+            progress(rows_processed, errors)
+
+    records = zip(iter_member_records(frame), frame["addr_code"].tolist(), frame["content_hash"].tolist())
+    for (member_code, error, user_data, membership_data), addr_code, content_hash in records:
+        rows_processed += 1
+        if error:
+            errors.append(error)
+            continue
+        if member_code in seen_codes:
+            errors.append(f"Duplicate MEMBER CODE {member_code}")
+            continue
+        seen_codes.add(member_code)
+
+        email = user_data["email"]
+        owner = user_ids_by_email.get(email)
+        if member_code in known:
+            user_id, previous_hash = known[member_code]
+            if previous_hash == content_hash:
+                unchanged += 1
+                continue
+            if owner is not None and owner != user_id:
+                errors.append(f"User with email {email} already exists")
+                continue
+            pending += 1
+        elif owner is not None:
+            if owner in linked_user_ids:
+                errors.append(f"User with email {email} already exists")
+                continue
+            # Link the member code to the user a plain import created earlier
+            user_id = owner
+            pending += 1
+        else:
+            user_id = uuid4()
+
+        user_ids_by_email[email] = user_id
+        linked_user_ids.add(user_id)
+        user_rows.append({"id": user_id, **user_data})
+        membership_rows.append({"id": uuid4(), "user_id": user_id, **membership_data})
+        link_rows.append({
+            "id": uuid4(),
+            "member_code": member_code,
+            "addr_code": addr_code or None,
+            "content_hash": content_hash,
+            "user_id": user_id,
+        })
+
+        if len(link_rows) >= batch_size:
+            flush_batch()
+
+    flush_batch()
+    if progress:
+        progress(rows_processed, errors)
+
+    return created, updated, unchanged, errors
@@ -0,0 +1,92 @@
+from datetime import date
+from typing import Dict, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.booking import BookingItem
+from app.models.seva import Seva, SevaSlot
+
+# (seva_id, slot_date) -> quantity
+SlotQuantities = Dict[Tuple[UUID, date], int]
+
+class SoldOut(Exception):
+    def __init__(self, seva_id: UUID, slot_date: date):
+        super().__init__(f"Seva {seva_id} is sold out on {slot_date.isoformat()}")
+        self.seva_id = seva_id
+        self.slot_date = slot_date
+
+async def reserve_slots(db: AsyncSession, quantities: SlotQuantities, capacities: Dict[UUID, int]) -> None:
+    """
+    Reserve quantities on capacity-limited slots, in the caller's transaction.
+
+    `capacities` holds the daily capacity of each seva in `quantities`; it
+    is used for slots that don't have a row yet. The reservation itself is
+    a conditional UPDATE (reserved + quantity <= capacity), so the row lock
+    it takes is held until commit and concurrent bookings of the same slot
+    queue on that row alone and never oversell. Slots are visited in a
+    fixed order so two multi-item bookings can't deadlock.
+
+    Raises SoldOut (the caller should roll back) if any slot is full.
+    """
+    for (seva_id, slot_date) in sorted(quantities):
+        quantity = quantities[(seva_id, slot_date)]
+        await db.execute(
+            pg_insert(SevaSlot)
+            .values(seva_id=seva_id, slot_date=slot_date, capacity=capacities[seva_id], reserved=0)
+            .on_conflict_do_nothing(index_elements=["seva_id", "slot_date"])
+        )
+        result = await db.execute(
+            update(SevaSlot)
+            .where(
+                SevaSlot.seva_id == seva_id,
+                SevaSlot.slot_date == slot_date,
+                SevaSlot.reserved + quantity <= SevaSlot.capacity,
+            )
+            .values(reserved=SevaSlot.reserved + quantity)
+            .returning(SevaSlot.id)
+        )
+        if result.first() is None:
+            raise SoldOut(seva_id, slot_date)
+
+async def booking_slot_quantities(db: AsyncSession, booking_ids: Sequence[UUID]) -> SlotQuantities:
+    """Slot quantities held by the given bookings, summed per slot."""
+    result = await db.execute(
+        select(BookingItem.seva_id, BookingItem.slot_date, func.sum(BookingItem.quantity))
+        .where(BookingItem.booking_id.in_(booking_ids), BookingItem.slot_date.is_not(None))
+        .group_by(BookingItem.seva_id, BookingItem.slot_date)
+    )
+    return {(seva_id, slot_date): quantity for seva_id, slot_date, quantity in result.all()}
+
+async def release_slots(db: AsyncSession, quantities: SlotQuantities) -> None:
+    """Give reserved quantities back, e.g. when a booking's payment fails."""
+    for (seva_id, slot_date) in sorted(quantities):
+        await db.execute(
+            update(SevaSlot)
+            .where(
+                SevaSlot.seva_id == seva_id,
+                SevaSlot.slot_date == slot_date,
+                # Skip slots created after the booking was made, which never held it
+                SevaSlot.reserved >= quantities[(seva_id, slot_date)],
+            )
+            .values(reserved=SevaSlot.reserved - quantities[(seva_id, slot_date)])
+        )
+
+async def reserve_booking_slots(db: AsyncSession, booking_id: UUID) -> None:
+    """Reserve a booking's slots again, e.g. when a failed payment is retried."""
+    quantities = await booking_slot_quantities(db, [booking_id])
+    if not quantities:
+        return
+    result = await db.execute(
+        select(Seva.id, Seva.daily_capacity)
+        .where(Seva.id.in_({seva_id for seva_id, _ in quantities}), Seva.daily_capacity.is_not(None))
+    )
+    capacities = dict(result.all())
+    await reserve_slots(
+        db, {key: quantity for key, quantity in quantities.items() if key[0] in capacities}, capacities
+    )
+
+async def release_booking_slots(db: AsyncSession, booking_id: UUID) -> None:
+    await release_slots(db, await booking_slot_quantities(db, [booking_id]))
\ No newline at end of file
@@ -0,0 +1,140 @@
+import enum
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class JobStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested."""
+
+class Job:
+    """
+    A unit of background work and its progress counters.
+
+    The job function receives the Job and should call report() as it makes
+    progress; report() raises JobCancelled when the job has been cancelled.
+    """
+
+    def __init__(self, kind: str):
+        self.id: UUID = uuid4()
+        self.kind = kind
+        self.status = JobStatus.PENDING
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.rows_processed = 0
+        self.errors: List[str] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def error_count(self) -> int:
+        return len(self.errors)
+
+    @property
+    def rows_per_second(self) -> float:
+        if self._started is None:
+            return 0.0
+        elapsed = (self._finished or time.monotonic()) - self._started
+        return self.rows_processed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+    def report(self, rows_processed: int, errors: List[str]) -> None:
+        """Record progress and stop the job if it has been cancelled."""
+        self.rows_processed = rows_processed
+        self.errors = errors
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def _run(self, fn: Callable[..., Optional[Dict[str, Any]]], args: tuple) -> None:
+        if self._cancel.is_set():
+            self.status = JobStatus.CANCELLED
+            self.finished_at = datetime.utcnow()
+            return
+        self.status = JobStatus.RUNNING
+        self.started_at = datetime.utcnow()
+        self._started = time.monotonic()
+        try:
+            self.result = fn(self, *args)
+            self.status = JobStatus.COMPLETED
+        except JobCancelled:
+            self.status = JobStatus.CANCELLED
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", self.id, self.kind)
+            self.errors.append(f"Job failed: {str(e)}")
+            self.status = JobStatus.FAILED
+        finally:
+            self._finished = time.monotonic()
+            self.finished_at = datetime.utcnow()
+
+class JobManager:
+    """
+    Runs jobs on a small worker pool, off the event loop, and keeps the most
+    recent ones around so their progress can be polled.
+    """
+
+    def __init__(self, max_workers: int, history_size: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._history_size = history_size
+        self._jobs: "OrderedDict[UUID, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[..., Optional[Dict[str, Any]]], *args: Any) -> Job:
+        job = Job(kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(job._run, fn, args)
+        return job
+
+    def get(self, job_id: UUID) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: UUID) -> Optional[Job]:
+        job = self.get(job_id)
+        if job and not job.is_finished:
+            job.cancel()
+        return job
+
+    def _prune(self) -> None:
+        # Drop the oldest finished jobs once the history is full
+        excess = len(self._jobs) - self._history_size
+        for job_id in [j.id for j in self._jobs.values() if j.is_finished][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+job_manager = JobManager(
+    max_workers=settings.JOB_WORKERS,
+    history_size=settings.JOB_HISTORY_SIZE
+)
@@ -0,0 +1,87 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+MAX_PAGE_SIZE = 1000
+
+class PageParams:
+    """
+    Query parameters for keyset-paginated list endpoints.
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+        limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+def _load(value: Any, python_type: type) -> Any:
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return value
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    payload = json.dumps([_dump(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> List[Any]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(payload)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("wrong number of key values")
+        return [_load(value, key.type.python_type) for value, key in zip(values, keys)]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    keys: Sequence[InstrumentedAttribute],
+    params: PageParams,
+    descending: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run `query` as one page ordered by `keys`, which must be unique together
+    (end them with the primary key) and should be backed by an index.
+
+    Seeks past the cursor with a row-value comparison instead of OFFSET, so
+    every page costs the same however deep it is.
+    """
+    if params.cursor:
+        values = decode_cursor(params.cursor, keys)
+        position = tuple_(*values, types=[key.type for key in keys])
+        query = query.where(tuple_(*keys) < position if descending else tuple_(*keys) > position)
+    order_by = [key.desc() if descending else key.asc() for key in keys]
+
+    # One extra row tells us whether there is a next page
+    result = await db.execute(query.order_by(*order_by).limit(params.limit + 1))
+    items = result.scalars().all()
+
+    next_cursor = None
+    if len(items) > params.limit:
+        items = items[:params.limit]
+        next_cursor = encode_cursor([getattr(items[-1], key.key) for key in keys])
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,152 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import String, and_, cast, column, func, not_, or_, select, update, values
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.booking import Booking, PaymentStatus
+from app.utils.inventory import booking_slot_quantities, release_slots
+from app.utils.revenue import summary_delta
+
+# (payment_gateway_ref, payment_status, receipt_id)
+Outcome = Tuple[str, PaymentStatus, Optional[str]]
+
+class DuplicateReceipt(Exception):
+    """The same receipt_id is given for several gateway references."""
+
+    def __init__(self, refs: Sequence[str]):
+        super().__init__(f"The same receipt_id is given for payment_gateway_refs {', '.join(refs)}")
+        self.refs = refs
+
+class ReceiptConflict(Exception):
+    """Applying the outcomes would give more than one booking the same receipt_id."""
+
+    def __init__(self, refs: Sequence[str]):
+        super().__init__(
+            f"The receipt_id given for payment_gateway_refs {', '.join(refs)} is already "
+            f"used by another booking or would be shared by several"
+        )
+        self.refs = refs
+
+def _outcomes_table(outcomes: Sequence[Outcome]):
+    return values(
+        column("ref", String),
+        column("payment_status", String),
+        column("receipt_id", String),
+        name="outcome",
+    ).data([(ref, payment_status.name, receipt_id) for ref, payment_status, receipt_id in outcomes])
+
+async def _apply_chunk(db: AsyncSession, outcomes: Sequence[Outcome], report: Dict) -> None:
+    outcome = _outcomes_table(outcomes)
+    new_status = cast(outcome.c.payment_status, Booking.payment_status.type)
+
+    # Lock the matching bookings and see what changes
+    result = await db.execute(
+        select(Booking.id, Booking.payment_gateway_ref, Booking.payment_status)
+        .join(outcome, Booking.payment_gateway_ref == outcome.c.ref)
+        .order_by(Booking.id)
+        .with_for_update(of=Booking)
+    )
+    wanted = {ref: payment_status for ref, payment_status, _ in outcomes}
+    receipts = {ref: receipt_id for ref, _, receipt_id in outcomes}
+    matched_refs, changed, failed = set(), [], []
+    # Bookings per reference that the UPDATE below applies the outcome to
+    applied: Dict[str, int] = {}
+    for booking_id, ref, payment_status in result.all():
+        matched_refs.add(ref)
+        if payment_status == PaymentStatus.FAILED and wanted[ref] != PaymentStatus.FAILED:
+            report["skipped"].append(ref)
+            continue
+        applied[ref] = applied.get(ref, 0) + 1
+        if payment_status == wanted[ref]:
+            continue
+        changed.append(booking_id)
+        if wanted[ref] == PaymentStatus.FAILED:
+            failed.append(booking_id)
+    report["matched"] += len(matched_refs)
+    report["unmatched"].extend(ref for ref, _, _ in outcomes if ref not in matched_refs)
+
+    # receipt_id is unique, so it mustn't already belong to a booking with
+    # another reference, nor go to several bookings sharing one reference
+    result = await db.execute(
+        select(outcome.c.ref)
+        .join(Booking, Booking.receipt_id == outcome.c.receipt_id)
+        .where(Booking.payment_gateway_ref.is_distinct_from(outcome.c.ref))
+    )
+    conflicts = set(result.scalars())
+    conflicts.update(ref for ref, count in applied.items() if count > 1 and receipts[ref] is not None)
+    if conflicts:
+        raise ReceiptConflict(sorted(conflicts))
+
+    if changed:
+        await db.execute(summary_delta(changed, -1))
+    if failed:
+        await release_slots(db, await booking_slot_quantities(db, failed))
+
+    # One set-based UPDATE ... FROM (VALUES ...) for the whole chunk. A
+    # receipt_id taken by a concurrent transaction still fails here
+    try:
+        result = await db.execute(
+            update(Booking)
+            .where(
+                Booking.payment_gateway_ref == outcome.c.ref,
+                # FAILED bookings keep their status here (see skipped)
+                not_(and_(Booking.payment_status == PaymentStatus.FAILED, new_status != PaymentStatus.FAILED)),
+                or_(
+                    Booking.payment_status != new_status,
+                    and_(outcome.c.receipt_id.is_not(None), Booking.receipt_id.is_distinct_from(outcome.c.receipt_id)),
+                ),
+            )
+            .values(
+                payment_status=new_status,
+                receipt_id=func.coalesce(outcome.c.receipt_id, Booking.receipt_id),
+            )
+            .returning(Booking.id)
+            .execution_options(synchronize_session=False)
+        )
+    except IntegrityError:
+        raise ReceiptConflict(sorted(ref for ref, _, receipt_id in outcomes if receipt_id is not None))
+    report["updated"] += len(result.all())
+
+    if changed:
+        await db.execute(summary_delta(changed, 1))
+
+async def reconcile_payments(db: AsyncSession, outcomes: Sequence[Outcome]) -> Dict:
+    """
+    Apply payment outcomes from the gateway in one transaction, matching
+    bookings by payment_gateway_ref (several bookings may share one).
+
+    Works in chunks of RECONCILE_CHUNK_SIZE, each a locked SELECT plus one
+    UPDATE ... FROM (VALUES ...), and keeps the revenue summary and slot
+    inventory in step: bookings that fail release their slots. Bookings
+    already FAILED are not revived here, since that needs a capacity check.
+
+    Raises DuplicateReceipt if two references are given the same receipt_id,
+    and ReceiptConflict (after rolling back) if a receipt_id would end up on
+    more than one booking.
+    """
+    # The last outcome for a reference wins
+    latest = {}
+    for ref, payment_status, receipt_id in outcomes:
+        latest[ref] = (ref, payment_status, receipt_id)
+    deduplicated = list(latest.values())
+
+    refs_by_receipt: Dict[str, List[str]] = {}
+    for ref, _, receipt_id in deduplicated:
+        if receipt_id is not None:
+            refs_by_receipt.setdefault(receipt_id, []).append(ref)
+    duplicates = sorted(ref for refs in refs_by_receipt.values() if len(refs) > 1 for ref in refs)
+    if duplicates:
+        raise DuplicateReceipt(duplicates)
+
+    report = {"received": len(outcomes), "matched": 0, "updated": 0, "unmatched": [], "skipped": []}
+    size = settings.RECONCILE_CHUNK_SIZE
+    try:
+        for start in range(0, len(deduplicated), size):
+            await _apply_chunk(db, deduplicated[start:start + size], report)
+    except ReceiptConflict:
+        await db.rollback()
+        raise
+    await db.commit()
+    return report
\ No newline at end of file
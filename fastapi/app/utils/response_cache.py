@@ -0,0 +1,92 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, NamedTuple, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.utils.cache import VersionedCache
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime] = None
+
+def cached_json(
+    content: Any,
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None
+) -> CachedResponse:
+    """
+    Serialize content as the API would. The ETag defaults to a strong hash
+    of the body; pass one when the content has a cheaper version marker.
+    """
+    body = JSONResponse(content=jsonable_encoder(content)).body
+    if etag is None:
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    if last_modified is not None:
+        last_modified = (
+            last_modified.astimezone(timezone.utc) if last_modified.tzinfo
+            else last_modified.replace(tzinfo=timezone.utc)
+        )
+    return CachedResponse(body, etag, last_modified)
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored."""
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have whole seconds
+    return last_modified.replace(microsecond=0) <= since
+
+def cached_json_response(request: Request, cached: CachedResponse, cache_control: str) -> Response:
+    """
+    The cached body, or a 304 when the client already has it. If-None-Match
+    takes precedence; If-Modified-Since is only used without it.
+    """
+    headers = {"ETag": cached.etag, "Cache-Control": cache_control}
+    if cached.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(cached.last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        not_modified = etag_matches(if_none_match, cached.etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = bool(
+            if_modified_since and cached.last_modified is not None
+            and _not_modified_since(if_modified_since, cached.last_modified)
+        )
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+# Seva list pages and sevas by id, per worker. Fills are held back after a
+# write while a read replica may still be behind.
+seva_catalog = VersionedCache(
+    maxsize=settings.SEVA_CACHE_SIZE,
+    ttl=settings.SEVA_CACHE_TTL_SECONDS,
+    settle=settings.READ_YOUR_WRITES_SECONDS if settings.SQLALCHEMY_REPLICA_DATABASE_URI else 0
+)
+
+# Published pages by slug and pages of the published list, per worker,
+# bounded by the total size of the cached bodies
+page_cache = VersionedCache(
+    maxsize=settings.PAGE_CACHE_SIZE,
+    ttl=settings.PAGE_CACHE_TTL_SECONDS,
+    settle=settings.READ_YOUR_WRITES_SECONDS if settings.SQLALCHEMY_REPLICA_DATABASE_URI else 0,
+    maxweight=settings.PAGE_CACHE_MAX_BYTES,
+    weigh=lambda cached: len(cached.body)
+)
\ No newline at end of file
@@ -0,0 +1,70 @@
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Insert
+
+from app.core.config import settings
+from app.models.booking import Booking, BookingItem, PaymentStatus
+from app.models.seva_summary import SevaDailySummary
+
+def local_date(column):
+    """The calendar date of a timestamptz column in REPORT_TIMEZONE."""
+    return cast(func.timezone(settings.REPORT_TIMEZONE, column), Date)
+
+def summary_delta(booking_ids: Sequence[UUID], sign: int = 1) -> Insert:
+    """
+    An upsert that adds (sign=1) or removes (sign=-1) the items of the given
+    bookings to the SevaDailySummary rows for their dates and current
+    payment statuses.
+
+    Runs entirely in the database, so it uses the bookings' stored dates
+    and statuses; flush pending changes to them before executing it.
+    Summary rows are touched in key order to avoid deadlocks.
+    """
+    summary_date = local_date(Booking.booking_date)
+    source = (
+        select(
+            func.gen_random_uuid(),
+            BookingItem.seva_id,
+            summary_date,
+            Booking.payment_status,
+            func.sum(BookingItem.quantity) * sign,
+            func.sum(BookingItem.quantity * BookingItem.price_at_booking) * sign,
+        )
+        .join(Booking, Booking.id == BookingItem.booking_id)
+        .where(Booking.id.in_(booking_ids))
+        .group_by(BookingItem.seva_id, summary_date, Booking.payment_status)
+        .order_by(BookingItem.seva_id, summary_date, Booking.payment_status)
+    )
+    stmt = pg_insert(SevaDailySummary).from_select(
+        ["id", "seva_id", "summary_date", "payment_status", "quantity", "amount"], source
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=["seva_id", "summary_date", "payment_status"],
+        set_={
+            "quantity": SevaDailySummary.quantity + stmt.excluded.quantity,
+            "amount": SevaDailySummary.amount + stmt.excluded.amount,
+        },
+    )
+
+async def add_booking_to_summary(db: AsyncSession, booking_id: UUID) -> None:
+    await db.execute(summary_delta([booking_id], 1))
+
+async def remove_booking_from_summary(db: AsyncSession, booking_id: UUID) -> None:
+    await db.execute(summary_delta([booking_id], -1))
+
+async def set_payment_status(db: AsyncSession, booking: Booking, payment_status: PaymentStatus) -> None:
+    """
+    Change a booking's payment status and move its amounts between the
+    summary rows of the old and new status, in the caller's transaction.
+    The caller should hold a row lock on the booking (SELECT ... FOR UPDATE).
+    """
+    if booking.payment_status == payment_status:
+        return
+    await remove_booking_from_summary(db, booking.id)
+    booking.payment_status = payment_status
+    await db.flush()
+    await add_booking_to_summary(db, booking.id)
\ No newline at end of file
@@ -1,21 +1,45 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Optional, Union
 from jose import jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app import models
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.utils.cache import TTLCache
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small dedicated pool hashes in parallel
+# while the event loop keeps serving other requests
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
 # OAuth2 token setup
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False
+)
+
+# Other workers only see a changed user (e.g. no longer an admin) when
+# their cached copy expires, so the TTL is capped to bound that delay
+USER_CACHE_MAX_TTL_SECONDS = 300
+
+# Detached copies of recently resolved users, keyed by token subject
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=min(settings.USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_TTL_SECONDS)
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify that a plain password matches a hashed one."""
@@ -25,6 +49,18 @@ def get_password_hash(password: str) -> str:
     """Create a hashed version of the password."""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_hash_executor, verify_password, plain_password, hashed_password
+    )
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_hash_executor, get_password_hash, password)
+
 def create_access_token(
     subject: Union[str, UUID], expires_delta: Optional[timedelta] = None
 ) -> str:
@@ -39,8 +75,8 @@ def create_access_token(
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
 ) -> models.User:
     """Get the current authenticated user."""
     try:
@@ -54,30 +90,59 @@ def get_current_user(
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-    except jwt.JWTError:
+        user_uuid = UUID(user_id)
+    except (jwt.JWTError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    cached_user = user_cache.get(user_id)
+    if cached_user is not None:
+        # Attach a copy to this session without querying the database
+        return await db.merge(cached_user, load=False)
+
+    result = await db.execute(select(models.User).where(models.User.id == user_uuid))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return user
+    # Cache the loaded instance detached, so commits in this request
+    # can't expire it, and hand the request its own attached copy
+    db.expunge(user)
+    user_cache.set(user_id, user)
+    return await db.merge(user, load=False)
+
+async def get_current_user_optional(
+    db: AsyncSession = Depends(get_async_db), token: Optional[str] = Depends(oauth2_scheme_optional)
+) -> Optional[models.User]:
+    """Get the current user if a valid token was sent, otherwise None."""
+    if not token:
+        return None
+    try:
+        return await get_current_user(db=db, token=token)
+    except HTTPException:
+        return None
+
+def invalidate_cached_user(user_id: Union[str, UUID]) -> None:
+    """
+    Drop a user from this worker's resolution cache after it has changed.
+    Other workers keep their copy for up to the cache TTL.
+    """
+    user_cache.invalidate(str(user_id))
 
-def get_current_active_user(
+async def get_current_active_user(
     current_user: models.User = Depends(get_current_user),
 ) -> models.User:
     """Get the current active authenticated user."""
     # Could add logic to check if user is active
     return current_user
 
-def get_current_active_superuser(
+async def get_current_active_superuser(
     current_user: models.User = Depends(get_current_user),
 ) -> models.User:
     """Get the current active authenticated admin user."""
@@ -0,0 +1,237 @@
+import html
+import logging
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.booking import Booking, PaymentStatus
+from app.models.membership import Membership
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+def financial_year_label(financial_year: int) -> str:
+    """The Indian financial year starting in April of financial_year, e.g. "2023-24"."""
+    return f"{financial_year}-{(financial_year + 1) % 100:02d}"
+
+def financial_year_bounds(financial_year: int) -> Tuple[datetime, datetime]:
+    """Start (inclusive) and end (exclusive) of the financial year in REPORT_TIMEZONE."""
+    tz = ZoneInfo(settings.REPORT_TIMEZONE)
+    return (
+        datetime(financial_year, 4, 1, tzinfo=tz),
+        datetime(financial_year + 1, 4, 1, tzinfo=tz),
+    )
+
+def _donor_totals_query(financial_year: int):
+    """
+    Completed donations per user for the financial year, with the PAN given
+    on their most recent donation, in user id order.
+
+    Donations are summed in one grouped pass over the bookings, which the
+    user and membership rows are then joined to.
+    """
+    start, end = financial_year_bounds(financial_year)
+    totals = (
+        select(
+            Booking.user_id,
+            func.sum(Booking.donation_amount).label("total_donation"),
+            func.count().label("donation_count"),
+            func.min(Booking.booking_date).label("first_donation"),
+            func.max(Booking.booking_date).label("last_donation"),
+            func.array_agg(aggregate_order_by(Booking.pan_number, Booking.booking_date.desc()))
+                .filter(Booking.pan_number.isnot(None))[1]
+                .label("pan_number"),
+        )
+        .where(
+            Booking.booking_date >= start,
+            Booking.booking_date < end,
+            Booking.payment_status == PaymentStatus.COMPLETED,
+            Booking.donation_amount > 0,
+        )
+        .group_by(Booking.user_id)
+        .subquery()
+    )
+    return (
+        select(
+            User.id.label("user_id"),
+            User.first_name,
+            User.middle_name,
+            User.surname,
+            User.email,
+            Membership.postal_address,
+            Membership.pin_code,
+            totals.c.pan_number,
+            totals.c.total_donation,
+            totals.c.donation_count,
+            totals.c.first_donation,
+            totals.c.last_donation,
+        )
+        .join(totals, totals.c.user_id == User.id)
+        .outerjoin(Membership, Membership.user_id == User.id)
+        .order_by(User.id)
+    )
+
+def _stream_donors(financial_year: int, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield the financial year's donors in chunks of plain dicts.
+
+    yield_per uses a server-side cursor, so only one chunk is held in memory;
+    plain dicts are what gets pickled to the rendering processes.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            _donor_totals_query(financial_year).execution_options(yield_per=chunk_size)
+        )
+        for chunk in result.mappings().partitions():
+            yield [dict(row) for row in chunk]
+    finally:
+        db.close()
+
+def _format_amount(amount: Decimal) -> str:
+    return f"Rs. {amount:,.2f}"
+
+def _format_date(value: Any) -> str:
+    if isinstance(value, datetime):
+        value = value.astimezone(ZoneInfo(settings.REPORT_TIMEZONE))
+    return value.strftime("%d/%m/%Y") if value else ""
+
+def render_statement(donor: Dict[str, Any], financial_year: int, organization: Dict[str, str]) -> str:
+    """An HTML 80G donation statement for one donor's financial year totals."""
+    e = lambda value: html.escape(str(value or ""))
+    name = " ".join(p for p in (donor["first_name"], donor["middle_name"], donor["surname"]) if p)
+    address = ", ".join(p for p in (donor.get("postal_address"), donor.get("pin_code")) if p)
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>80G Donation Statement {e(financial_year_label(financial_year))} - {e(name)}</title>
+<style>
+body {{ font-family: sans-serif; max-width: 42em; margin: 2em auto; }}
+table {{ border-collapse: collapse; width: 100%; }}
+th, td {{ border: 1px solid #999; padding: 0.4em; text-align: left; }}
+</style>
+</head>
+<body>
+<h1>{e(organization["name"])}</h1>
+<p>{e(organization["address"])}<br>
+PAN: {e(organization["pan"])}<br>
+80G Registration: {e(organization["registration"])}</p>
+<h2>Statement of Donations for Financial Year {e(financial_year_label(financial_year))}</h2>
+<table>
+<tr><th>Donor</th><td>{e(name)}</td></tr>
+<tr><th>Address</th><td>{e(address)}</td></tr>
+<tr><th>Email</th><td>{e(donor["email"])}</td></tr>
+<tr><th>Donor PAN</th><td>{e(donor["pan_number"]) or "Not provided"}</td></tr>
+<tr><th>Number of donations</th><td>{donor["donation_count"]}</td></tr>
+<tr><th>Period</th><td>{_format_date(donor["first_donation"])} to {_format_date(donor["last_donation"])}</td></tr>
+<tr><th>Total donated</th><td>{_format_amount(donor["total_donation"])}</td></tr>
+</table>
+<p>Donations to {e(organization["name"])} are eligible for deduction under
+section 80G of the Income Tax Act, 1961. Statement generated on {_format_date(date.today())}.</p>
+</body>
+</html>"""
+
+def statement_filename(donor: Dict[str, Any], financial_year: int) -> str:
+    return f"80G-{financial_year_label(financial_year)}-{donor['user_id']}.html"
+
+def _render_chunk(
+    donors: List[Dict[str, Any]],
+    financial_year: int,
+    output_dir: str,
+    organization: Dict[str, str]
+) -> Tuple[int, List[str]]:
+    """Render and write one chunk of statements; runs in a worker process."""
+    written = 0
+    errors = []
+    for donor in donors:
+        try:
+            path = os.path.join(output_dir, statement_filename(donor, financial_year))
+            # Write then rename, so a rerun never leaves a half-written statement
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(render_statement(donor, financial_year, organization))
+            os.replace(path + ".tmp", path)
+            written += 1
+        except Exception as e:
+            errors.append(f"User {donor['user_id']}: {str(e)}")
+    return written, errors
+
+def generate_statements(
+    financial_year: int,
+    output_dir: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    progress: Optional[Callable[[int, List[str]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Write an 80G statement for every user who donated in the financial year
+    starting in April of financial_year.
+
+    Donors are streamed from the database a chunk at a time and each chunk
+    is rendered on a process pool. At most two chunks per worker are in
+    flight, so memory stays bounded however many donors there are.
+    """
+    output_dir = os.path.join(
+        output_dir or settings.STATEMENT_OUTPUT_DIR, f"FY{financial_year_label(financial_year)}"
+    )
+    workers = workers or settings.STATEMENT_WORKERS
+    chunk_size = chunk_size or settings.STATEMENT_CHUNK_SIZE
+    os.makedirs(output_dir, exist_ok=True)
+    organization = {
+        "name": settings.STATEMENT_ORGANIZATION_NAME,
+        "address": settings.STATEMENT_ORGANIZATION_ADDRESS,
+        "pan": settings.STATEMENT_ORGANIZATION_PAN,
+        "registration": settings.STATEMENT_80G_REGISTRATION,
+    }
+
+    donors = 0
+    written = 0
+    total = Decimal("0")
+    errors: List[str] = []
+    pending: Set[Future] = set()
+
+    def collect(done: Set[Future]) -> None:
+        nonlocal written
+        for future in done:
+            chunk_written, chunk_errors = future.result()
+            written += chunk_written
+            errors.extend(chunk_errors)
+
+    # spawn rather than fork: this runs on a job thread of a threaded server
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        try:
+            for chunk in _stream_donors(financial_year, chunk_size):
+                donors += len(chunk)
+                total += sum((d["total_donation"] for d in chunk), Decimal("0"))
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                    if progress:
+                        progress(written, errors)
+                pending.add(pool.submit(_render_chunk, chunk, financial_year, output_dir, organization))
+            done, pending = wait(pending)
+            collect(done)
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    if progress:
+        progress(written, errors)
+    logger.info(f"Wrote {written} of {donors} 80G statements for FY{financial_year_label(financial_year)} to {output_dir}")
+    return {
+        "financial_year": financial_year_label(financial_year),
+        "donors": donors,
+        "statements_written": written,
+        "total_donations": str(total),
+        "output_dir": os.path.abspath(output_dir),
+    }
\ No newline at end of file
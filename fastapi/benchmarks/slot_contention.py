@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Contention benchmark for seva slot reservations.
+
+Fires many concurrent booking transactions at a single seva slot on the
+configured PostgreSQL database and checks that it is never oversold:
+
+    python benchmarks/slot_contention.py --requests 500 --concurrency 100 --capacity 108
+
+--strategy naive runs an unlocked read-then-write for comparison, which
+shows the overselling the conditional update prevents. The seva and slot
+created for the run are deleted afterwards.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.models import user, seva, booking
+from app.models.seva import Seva, SevaSlot
+from app.utils.inventory import SoldOut, reserve_slots
+
+async def _reserve_conditional(db, seva_id, slot_date, capacity):
+    await reserve_slots(db, {(seva_id, slot_date): 1}, {seva_id: capacity})
+
+async def _reserve_naive(db, seva_id, slot_date, capacity):
+    slot = (await db.execute(
+        select(SevaSlot).where(SevaSlot.seva_id == seva_id, SevaSlot.slot_date == slot_date)
+    )).scalars().one()
+    if slot.reserved + 1 > slot.capacity:
+        raise SoldOut(seva_id, slot_date)
+    await asyncio.sleep(0)  # let other transactions interleave, as real request handling would
+    await db.execute(
+        update(SevaSlot).where(SevaSlot.id == slot.id).values(reserved=slot.reserved + 1)
+    )
+
+async def run(args) -> int:
+    engine = create_async_engine(
+        str(settings.SQLALCHEMY_ASYNC_DATABASE_URI),
+        pool_size=args.concurrency,
+        max_overflow=0,
+    )
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    reserve = _reserve_naive if args.strategy == "naive" else _reserve_conditional
+    seva_id = uuid.uuid4()
+    slot_date = date.today()
+
+    async with Session() as db:
+        db.add(Seva(id=seva_id, name=f"benchmark-{seva_id}", price=0, daily_capacity=args.capacity, is_active=False))
+        db.add(SevaSlot(seva_id=seva_id, slot_date=slot_date, capacity=args.capacity, reserved=0))
+        await db.commit()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, outcomes = [], {"booked": 0, "sold_out": 0, "error": 0}
+
+    async def one_booking():
+        async with semaphore:
+            started = time.perf_counter()
+            async with Session() as db:
+                try:
+                    await reserve(db, seva_id, slot_date, args.capacity)
+                    await db.commit()
+                    outcomes["booked"] += 1
+                except SoldOut:
+                    await db.rollback()
+                    outcomes["sold_out"] += 1
+                except Exception:
+                    await db.rollback()
+                    outcomes["error"] += 1
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*[one_booking() for _ in range(args.requests)])
+        elapsed = time.perf_counter() - started
+
+        async with Session() as db:
+            reserved = (await db.execute(
+                select(SevaSlot.reserved).where(SevaSlot.seva_id == seva_id)
+            )).scalar_one()
+    finally:
+        async with Session() as db:
+            await db.execute(delete(SevaSlot).where(SevaSlot.seva_id == seva_id))
+            await db.execute(delete(Seva).where(Seva.id == seva_id))
+            await db.commit()
+        await engine.dispose()
+
+    latencies.sort()
+    print(f"strategy={args.strategy} requests={args.requests} concurrency={args.concurrency} capacity={args.capacity}")
+    print(f"elapsed={elapsed:.3f}s throughput={args.requests / elapsed:.1f} tx/s")
+    print(
+        f"latency p50={statistics.median(latencies) * 1000:.1f}ms "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms "
+        f"max={latencies[-1] * 1000:.1f}ms"
+    )
+    print(f"booked={outcomes['booked']} sold_out={outcomes['sold_out']} errors={outcomes['error']} reserved={reserved}")
+
+    expected = min(args.requests, args.capacity)
+    if outcomes["booked"] != reserved or reserved != expected:
+        print(f"FAIL: expected exactly {expected} reservations")
+        return 1
+    print("OK: no overselling")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent reservations of one seva slot")
+    parser.add_argument("--requests", type=int, default=500, help="Booking transactions to run")
+    parser.add_argument("--concurrency", type=int, default=100, help="Transactions in flight at once")
+    parser.add_argument("--capacity", type=int, default=108, help="Capacity of the slot")
+    parser.add_argument("--strategy", choices=["conditional", "naive"], default="conditional")
+    sys.exit(asyncio.run(run(parser.parse_args())))
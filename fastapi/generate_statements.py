@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+import os
+import sys
+import argparse
+import logging
+
+# Add the current directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models import user, membership, seva, booking, page, member_import, seva_summary, idempotency_key
+from app.utils.statements import generate_statements
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Write 80G donation statements for a financial year")
+    parser.add_argument("financial_year", type=int, help="Year the financial year starts in, e.g. 2023 for April 2023 - March 2024")
+    parser.add_argument("--output-dir", help="Directory to write statements under (default: STATEMENT_OUTPUT_DIR)")
+    parser.add_argument("--workers", type=int, help="Rendering processes (default: STATEMENT_WORKERS)")
+    parser.add_argument("--chunk-size", type=int, help="Donors fetched and rendered per chunk (default: STATEMENT_CHUNK_SIZE)")
+
+    args = parser.parse_args()
+
+    errors = []
+
+    def progress(written, job_errors):
+        errors[:] = job_errors
+
+    result = generate_statements(
+        args.financial_year,
+        output_dir=args.output_dir,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        progress=progress
+    )
+    logger.info(
+        f"FY{result['financial_year']}: {result['statements_written']} of {result['donors']} statements "
+        f"written to {result['output_dir']} (total donations {result['total_donations']})"
+    )
+    if errors:
+        logger.warning(f"Encountered {len(errors)} errors:")
+        for error in errors[:10]:  # Show first 10 errors
+            logger.warning(f"  {error}")
+        if len(errors) > 10:
+            logger.warning(f"  ... and {len(errors) - 10} more errors")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -8,22 +8,21 @@ from sqlalchemy.exc import SQLAlchemyError
 # Add the current directory to the path so we can import app modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from app.db.migrate import upgrade_database, check_schema, SchemaOutOfDate
 from app.db.session import engine, SessionLocal
-from app.db.base_class import Base
-from app.models import user, membership, seva, booking, page
-from app.utils.import_data import import_members_from_csv
+from app.models import user, membership, seva, booking, page, member_import, seva_summary, idempotency_key
 from app.utils.security import get_password_hash
 from app.models.user import UserType
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def init_db(csv_import=False, members_csv=None, address_csv=None):
+def init_db(csv_import=False, members_csv=None, address_csv=None, bulk=False, batch_size=None, incremental=False):
     try:
-        # Create tables
-        logger.info("Creating database tables...")
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully!")
+        # Create or upgrade tables
+        logger.info("Applying database migrations...")
+        upgrade_database()
+        logger.info("Database schema is up to date!")
         
         # Create initial admin account
         db = SessionLocal()
@@ -62,12 +61,27 @@ def init_db(csv_import=False, members_csv=None, address_csv=None):
                     logger.error(f"Address CSV file not found: {address_csv}")
                     return
                 
-                logger.info("Importing member data from CSV files...")
-                users_created, memberships_created, errors = import_members_from_csv(
-                    db, members_csv, address_csv
+                # pandas is only loaded when an import is actually requested
+                from app.utils.import_data import (
+                    import_members_from_csv, bulk_import_members_from_csv, incremental_import_members_from_csv
                 )
-                
-                logger.info(f"Import completed: {users_created} users and {memberships_created} memberships created")
+
+                logger.info("Importing member data from CSV files...")
+                if incremental:
+                    created, updated, unchanged, errors = incremental_import_members_from_csv(
+                        db, members_csv, address_csv, batch_size=batch_size
+                    )
+                    logger.info(f"Incremental import completed: {created} members created, {updated} updated, {unchanged} unchanged")
+                else:
+                    if bulk:
+                        users_created, memberships_created, errors = bulk_import_members_from_csv(
+                            db, members_csv, address_csv, batch_size=batch_size
+                        )
+                    else:
+                        users_created, memberships_created, errors = import_members_from_csv(
+                            db, members_csv, address_csv
+                        )
+                    logger.info(f"Import completed: {users_created} users and {memberships_created} memberships created")
                 if errors:
                     logger.warning(f"Encountered {len(errors)} errors during import:")
                     for error in errors[:10]:  # Show first 10 errors
@@ -85,13 +99,33 @@ def init_db(csv_import=False, members_csv=None, address_csv=None):
         logger.error(f"Error initializing database: {str(e)}")
         raise
 
+def check_db_schema() -> bool:
+    """
+    Report whether the database is at the latest migration, without changing it
+    """
+    try:
+        with engine.connect() as connection:
+            check_schema(connection)
+    except SchemaOutOfDate as e:
+        logger.error(str(e))
+        return False
+    logger.info("Database schema is up to date")
+    return True
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Initialize the GSB Mandal database")
+    parser.add_argument("--check-schema", action="store_true", help="Only check that all migrations are applied (exit status 1 if not)")
     parser.add_argument("--csv-import", action="store_true", help="Import member data from CSV files")
     parser.add_argument("--members-csv", help="Path to the members CSV file")
     parser.add_argument("--address-csv", help="Path to the address CSV file")
+    parser.add_argument("--bulk", action="store_true", help="Use batched set-based inserts for the CSV import")
+    parser.add_argument("--incremental", action="store_true", help="Only upsert members whose rows changed since the last import")
+    parser.add_argument("--batch-size", type=int, help="Rows per batch/commit for --bulk/--incremental (default: IMPORT_BATCH_SIZE)")
     
     args = parser.parse_args()
+
+    if args.check_schema:
+        sys.exit(0 if check_db_schema() else 1)
     
     # CSV import options
     csv_import = args.csv_import
@@ -102,5 +136,5 @@ if __name__ == "__main__":
     if csv_import and (not members_csv or not address_csv):
         parser.error("--csv-import requires both --members-csv and --address-csv")
     
-    init_db(csv_import, members_csv, address_csv)
+    init_db(csv_import, members_csv, address_csv, bulk=args.bulk, batch_size=args.batch_size, incremental=args.incremental)
     logger.info("Database initialization completed")
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""Initial schema, as previously created by Base.metadata.create_all
+
+Databases that were created by create_all already match this revision and
+are stamped at it by app.db.migrate.upgrade_database before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2023-05-20 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ENUMS = (
+    "user_type_enum", "gender_enum", "marital_status_enum", "math_enum",
+    "membership_type_enum", "membership_status_enum", "payment_status_enum",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("first_name", sa.String(), nullable=False),
+        sa.Column("middle_name", sa.String(), nullable=True),
+        sa.Column("surname", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("password_hash", sa.String(), nullable=True),
+        sa.Column("mobile_no", sa.String(), nullable=False),
+        sa.Column("user_type", sa.Enum("MEMBER", "NON_MEMBER", name="user_type_enum"), nullable=False),
+        sa.Column("is_admin", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_user_id", "user", ["id"])
+    op.create_index("ix_user_email", "user", ["email"], unique=True)
+
+    op.create_table(
+        "seva",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("price", sa.Numeric(10, 2), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index("ix_seva_id", "seva", ["id"])
+
+    op.create_table(
+        "page",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("slug", sa.String(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_by", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("is_published", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["created_by"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("slug"),
+    )
+    op.create_index("ix_page_id", "page", ["id"])
+
+    op.create_table(
+        "membership",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("gender", sa.Enum("MALE", "FEMALE", name="gender_enum"), nullable=False),
+        sa.Column("postal_address", sa.Text(), nullable=False),
+        sa.Column("pin_code", sa.String(6), nullable=False),
+        sa.Column("date_of_birth", sa.Date(), nullable=False),
+        sa.Column("occupation", sa.String(), nullable=False),
+        sa.Column("qualification", sa.String(), nullable=False),
+        sa.Column("marital_status", sa.Enum("MARRIED", "UNMARRIED", name="marital_status_enum"), nullable=False),
+        sa.Column("number_of_kids", sa.Integer(), nullable=True),
+        sa.Column("gotra", sa.String(), nullable=False),
+        sa.Column("kuladevata", sa.String(), nullable=False),
+        sa.Column("math", sa.Enum("KASHI", "GOKARNA", "KAVALE", name="math_enum"), nullable=False),
+        sa.Column("native_place", sa.String(), nullable=False),
+        sa.Column("other_gsb_memberships", sa.Text(), nullable=True),
+        sa.Column("introducer_name", sa.String(), nullable=True),
+        sa.Column("membership_type", sa.Enum("PATRON", name="membership_type_enum"), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "APPROVED", "REJECTED", name="membership_status_enum"),
+            nullable=False,
+        ),
+        sa.Column("application_date", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("approval_date", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_membership_id", "membership", ["id"])
+    op.create_index("ix_membership_user_id", "membership", ["user_id"], unique=True)
+
+    op.create_table(
+        "booking",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("booking_date", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("total_amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("donation_amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("pan_number", sa.String(10), nullable=True),
+        sa.Column(
+            "payment_status",
+            sa.Enum("PENDING", "COMPLETED", "FAILED", name="payment_status_enum"),
+            nullable=False,
+        ),
+        sa.Column("receipt_id", sa.String(), nullable=True),
+        sa.Column("payment_gateway_ref", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("receipt_id"),
+    )
+    op.create_index("ix_booking_id", "booking", ["id"])
+
+    op.create_table(
+        "bookingitem",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("booking_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("seva_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("price_at_booking", sa.Numeric(10, 2), nullable=False),
+        sa.ForeignKeyConstraint(["booking_id"], ["booking.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["seva_id"], ["seva.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_bookingitem_id", "bookingitem", ["id"])
+
+
+def downgrade() -> None:
+    for table in ("bookingitem", "booking", "membership", "page", "seva", "user"):
+        op.drop_table(table)
+    for name in ENUMS:
+        sa.Enum(name=name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,56 @@
+"""Hot-path indexes; drop the duplicate primary-key indexes
+
+Indexes are built and dropped CONCURRENTLY so this can run against a live
+database without locking writes to the tables. CONCURRENTLY can't run inside
+a transaction, so the work happens in an autocommit block; if a build is
+interrupted, drop the INVALID index it leaves behind and re-run the upgrade.
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2023-06-05 10:00:00
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001a"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns)
+INDEXES = (
+    ("ix_booking_user_id_booking_date", "booking", ["user_id", "booking_date"]),
+    ("ix_booking_payment_gateway_ref", "booking", ["payment_gateway_ref"]),
+    ("ix_bookingitem_booking_id", "bookingitem", ["booking_id"]),
+    ("ix_bookingitem_seva_id", "bookingitem", ["seva_id"]),
+    ("ix_seva_is_active", "seva", ["is_active"]),
+    ("ix_page_is_published", "page", ["is_published"]),
+    ("ix_membership_status", "membership", ["status"]),
+)
+
+# Redundant with each table's primary key index
+PK_DUPLICATE_TABLES = ("user", "seva", "page", "membership", "booking", "bookingitem", "memberimport")
+
+
+def _create_index(name: str, table: str, columns: list) -> None:
+    op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON "{table}" ({", ".join(columns)})')
+
+
+def _drop_index(name: str) -> None:
+    op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            _create_index(name, table, columns)
+        for table in PK_DUPLICATE_TABLES:
+            _drop_index(f"ix_{table}_id")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in PK_DUPLICATE_TABLES:
+            _create_index(f"ix_{table}_id", table, ["id"])
+        for name, table, columns in reversed(INDEXES):
+            _drop_index(name)
@@ -0,0 +1,36 @@
+"""Indexes backing keyset pagination of the list endpoints
+
+Sevas page on (name, id), which the unique index on name already covers.
+Built CONCURRENTLY like 0002.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2023-06-12 10:00:00
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns)
+INDEXES = (
+    ("ix_user_created_at_id", "user", ["created_at", "id"]),
+    ("ix_membership_application_date_id", "membership", ["application_date", "id"]),
+    ("ix_booking_booking_date_id", "booking", ["booking_date", "id"]),
+    ("ix_page_created_at_id", "page", ["created_at", "id"]),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON "{table}" ({", ".join(columns)})')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
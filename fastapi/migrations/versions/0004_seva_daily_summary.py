@@ -0,0 +1,58 @@
+"""Seva revenue summary table, backfilled from existing bookings
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2023-06-20 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sevadailysummary",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("seva_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("summary_date", sa.Date(), nullable=False),
+        sa.Column(
+            "payment_status",
+            postgresql.ENUM("PENDING", "COMPLETED", "FAILED", name="payment_status_enum", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.ForeignKeyConstraint(["seva_id"], ["seva.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("seva_id", "summary_date", "payment_status", name="uq_sevadailysummary_key"),
+    )
+    op.create_index("ix_sevadailysummary_summary_date", "sevadailysummary", ["summary_date"])
+
+    # Backfill (gen_random_uuid() needs PostgreSQL 13+). Bookings that the
+    # previous application version creates after this runs are not counted,
+    # so pause writes or deploy the new code together with the migration
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO sevadailysummary (id, seva_id, summary_date, payment_status, quantity, amount)
+            SELECT gen_random_uuid(), bi.seva_id, (timezone(:tz, b.booking_date))::date, b.payment_status,
+                   sum(bi.quantity), sum(bi.quantity * bi.price_at_booking)
+            FROM bookingitem bi
+            JOIN booking b ON b.id = bi.booking_id
+            GROUP BY bi.seva_id, (timezone(:tz, b.booking_date))::date, b.payment_status
+            """
+        ).bindparams(tz=settings.REPORT_TIMEZONE)
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sevadailysummary_summary_date", table_name="sevadailysummary")
+    op.drop_table("sevadailysummary")
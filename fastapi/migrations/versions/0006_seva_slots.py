@@ -0,0 +1,40 @@
+"""Seva daily capacity, slot inventory and booking item slot dates
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2023-07-10 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable columns without defaults: no table rewrite on live tables
+    op.add_column("seva", sa.Column("daily_capacity", sa.Integer(), nullable=True))
+    op.add_column("bookingitem", sa.Column("slot_date", sa.Date(), nullable=True))
+
+    op.create_table(
+        "sevaslot",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("seva_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("slot_date", sa.Date(), nullable=False),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("reserved", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["seva_id"], ["seva.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("seva_id", "slot_date", name="uq_sevaslot_seva_id_slot_date"),
+        sa.CheckConstraint("reserved >= 0 AND reserved <= capacity", name="ck_sevaslot_reserved"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sevaslot")
+    op.drop_column("bookingitem", "slot_date")
+    op.drop_column("seva", "daily_capacity")
@@ -0,0 +1,41 @@
+"""Full-text search over pages
+
+A stored generated tsvector over title (weight A) and content (weight B),
+and a GIN index on it built CONCURRENTLY like 0002. Adding a stored
+generated column rewrites the page table, which is small.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2023-07-24 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Fixed here rather than taken from the model: changing the configuration
+# needs a migration that rebuilds the column
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "page",
+        sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True),
+    )
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_page_search_vector ON page USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_page_search_vector")
+    op.drop_column("page", "search_vector")
@@ -0,0 +1,26 @@
+"""Claim tokens for idempotency keys
+
+The database idempotency store only completes or releases a key while it
+still holds the token of its claim, so a request whose claim was taken over
+can't overwrite the new holder's response.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2023-07-31 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("idempotencykey", sa.Column("claim_token", sa.String(32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("idempotencykey", "claim_token")
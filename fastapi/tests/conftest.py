@@ -0,0 +1,71 @@
+"""
+Shared fixtures. Tests run against TEST_DATABASE_URL (an async URL, e.g.
+postgresql+asyncpg://...) when set, otherwise against a fresh SQLite file
+per test (needs aiosqlite).
+
+Tests of SQL that only Postgres runs (upserts from a SELECT, UPDATE ...
+FROM VALUES, time zone conversion) are marked postgres and skipped on SQLite.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+from sqlalchemy import UUID
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import NullPool
+
+# Add the project directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import models
+from app.db import session
+from app.db.base_class import Base
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+ON_POSTGRES = (TEST_DATABASE_URL or "").startswith("postgresql")
+
+# The page table's search column needs Postgres; no test uses pages
+TABLES = [table for table in Base.metadata.sorted_tables if table is not models.Page.__table__]
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    # SQLite has no UUID type; the uuid values are stored as hex strings
+    return "CHAR(32)"
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgres: needs TEST_DATABASE_URL to point at Postgres")
+
+def pytest_runtest_setup(item):
+    if item.get_closest_marker("postgres") and not ON_POSTGRES:
+        pytest.skip("needs TEST_DATABASE_URL to point at Postgres")
+
+@pytest.fixture
+def engine(tmp_path):
+    """
+    An async engine on an empty schema. NullPool keeps connections from
+    outliving the event loop of each asyncio.run() in a test.
+    """
+    if TEST_DATABASE_URL:
+        url = TEST_DATABASE_URL
+    else:
+        pytest.importorskip("aiosqlite")
+        url = f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"
+    engine = create_async_engine(url, poolclass=NullPool)
+
+    async def reset():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all, tables=TABLES)
+            await conn.run_sync(Base.metadata.create_all, tables=TABLES)
+
+    asyncio.run(reset())
+    yield engine
+    asyncio.run(engine.dispose())
+
+@pytest.fixture
+def Session(engine, monkeypatch):
+    """A session factory on the test engine, also used by code that opens its own sessions."""
+    factory = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+    monkeypatch.setattr(session, "AsyncSessionLocal", factory)
+    return factory
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+read_bookings loads a page of bookings in a fixed number of queries: one for
+the bookings and one for all of their items (with their sevas joined in when
+include_seva is set), however many bookings are on the page.
+"""
+import asyncio
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from app import models, schemas
+from app.api.api_v1.endpoints.bookings import read_bookings
+from app.utils.fields import FieldsParam
+from app.utils.pagination import PageParams
+
+async def _count_list_queries(engine, Session, page_size: int, include_seva: bool) -> int:
+    async with Session() as db:
+        admin = models.User(
+            first_name="Admin", surname="User", email="admin@example.org",
+            mobile_no="9999999999", is_admin=True
+        )
+        sevas = [models.Seva(name=f"Seva {i}", price=Decimal("100.00")) for i in range(3)]
+        db.add_all([admin, *sevas])
+        await db.flush()
+        for i in range(page_size):
+            db.add(models.Booking(
+                user_id=admin.id,
+                total_amount=Decimal("200.00"),
+                donation_amount=Decimal("0.00"),
+                items=[
+                    models.BookingItem(seva_id=sevas[i % 3].id, quantity=1, price_at_booking=Decimal("100.00")),
+                    models.BookingItem(seva_id=sevas[(i + 1) % 3].id, quantity=1, price_at_booking=Decimal("100.00")),
+                ],
+            ))
+        await db.commit()
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with Session() as db:
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+        try:
+            result = await read_bookings(
+                page=PageParams(cursor=None, limit=page_size),
+                include_seva=include_seva,
+                fields=FieldsParam(fields=None),
+                db=db,
+                current_user=admin,
+            )
+            # Serializing must not lazy-load anything either
+            response = schemas.CursorPage[schemas.Booking].parse_obj(result)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+    assert len(response.items) == page_size
+    assert all(len(booking.items) == 2 for booking in response.items)
+    if include_seva:
+        assert all(item.seva_name for booking in response.items for item in booking.items)
+    return len(statements)
+
+@pytest.mark.parametrize("include_seva", [False, True])
+@pytest.mark.parametrize("page_size", [1, 10, 50])
+def test_booking_list_query_count_is_fixed(engine, Session, page_size: int, include_seva: bool) -> None:
+    assert asyncio.run(_count_list_queries(engine, Session, page_size, include_seva)) == 2
\ No newline at end of file
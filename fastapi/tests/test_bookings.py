@@ -0,0 +1,143 @@
+"""
+Creating bookings: what non-admins may set, the revenue summary rows a new
+booking lands in, and the slots of sevas with a daily capacity. Bookings
+that get as far as being saved update the summary and slots with Postgres
+upserts, so those tests need Postgres.
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app import models, schemas
+from app.api.api_v1.endpoints.bookings import _create_booking, update_booking
+from app.core.config import settings
+from app.models.booking import PaymentStatus
+
+def _paid_booking(seva_id) -> schemas.BookingCreate:
+    return schemas.BookingCreate(
+        items=[{"seva_id": seva_id, "quantity": 2}],
+        payment_status=PaymentStatus.COMPLETED,
+        receipt_id="RCPT-1",
+        payment_gateway_ref="pay_123",
+    )
+
+async def _create_as(Session, is_admin: bool):
+    async with Session() as db:
+        user = models.User(
+            first_name="Test", surname="User", email="user@example.org",
+            mobile_no="9999999999", is_admin=is_admin
+        )
+        seva = models.Seva(name="Seva", price=Decimal("100.00"))
+        db.add_all([user, seva])
+        await db.commit()
+
+        booking = await _create_booking(db, _paid_booking(seva.id), user)
+        summary = (await db.execute(select(models.SevaDailySummary))).scalars().all()
+    return booking, summary
+
+@pytest.mark.postgres
+def test_member_cannot_record_a_payment(Session) -> None:
+    booking, summary = asyncio.run(_create_as(Session, is_admin=False))
+
+    assert booking.payment_status == PaymentStatus.PENDING
+    assert booking.receipt_id is None
+    assert booking.payment_gateway_ref is None
+    assert [(row.payment_status, row.quantity, row.amount) for row in summary] == [
+        (PaymentStatus.PENDING, 2, Decimal("200.00"))
+    ]
+
+@pytest.mark.postgres
+def test_admin_can_record_a_payment(Session) -> None:
+    booking, summary = asyncio.run(_create_as(Session, is_admin=True))
+
+    assert booking.payment_status == PaymentStatus.COMPLETED
+    assert booking.receipt_id == "RCPT-1"
+    assert booking.payment_gateway_ref == "pay_123"
+    assert [(row.payment_status, row.quantity, row.amount) for row in summary] == [
+        (PaymentStatus.COMPLETED, 2, Decimal("200.00"))
+    ]
+
+def _today() -> date:
+    return datetime.now(ZoneInfo(settings.REPORT_TIMEZONE)).date()
+
+async def _add_capacity_seva(Session, capacity: int):
+    async with Session() as db:
+        user = models.User(
+            first_name="Test", surname="User", email="user@example.org", mobile_no="9999999999", is_admin=True
+        )
+        seva = models.Seva(name="Seva", price=Decimal("100.00"), daily_capacity=capacity)
+        db.add_all([user, seva])
+        await db.commit()
+    return user, seva
+
+async def _book(Session, user, seva, quantity: int, slot_date) -> models.Booking:
+    async with Session() as db:
+        return await _create_booking(
+            db,
+            schemas.BookingCreate(items=[{"seva_id": seva.id, "quantity": quantity, "slot_date": slot_date}]),
+            user,
+        )
+
+async def _reserved(Session, seva, slot_date) -> int:
+    async with Session() as db:
+        slot = (await db.execute(
+            select(models.SevaSlot).where(models.SevaSlot.seva_id == seva.id, models.SevaSlot.slot_date == slot_date)
+        )).scalars().one()
+        return slot.reserved
+
+@pytest.mark.parametrize("days_from_today, detail", [
+    (None, "slot_date is required"),
+    (-1, "is in the past"),
+])
+def test_capacity_seva_needs_a_current_slot_date(Session, days_from_today, detail) -> None:
+    slot_date = None if days_from_today is None else _today() + timedelta(days=days_from_today)
+
+    async def book():
+        user, seva = await _add_capacity_seva(Session, capacity=10)
+        await _book(Session, user, seva, 1, slot_date)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(book())
+    assert error.value.status_code == 400
+    assert detail in error.value.detail
+
+@pytest.mark.postgres
+def test_slot_sells_out_at_capacity(Session) -> None:
+    slot_date = _today()
+
+    async def book():
+        user, seva = await _add_capacity_seva(Session, capacity=3)
+        await _book(Session, user, seva, 2, slot_date)
+        with pytest.raises(HTTPException) as error:
+            await _book(Session, user, seva, 2, slot_date)
+        assert error.value.status_code == 409
+        await _book(Session, user, seva, 1, slot_date)
+        return await _reserved(Session, seva, slot_date)
+
+    assert asyncio.run(book()) == 3
+
+@pytest.mark.postgres
+def test_failed_booking_gives_its_slot_back(Session) -> None:
+    slot_date = _today() + timedelta(days=7)
+
+    async def fail_and_retry():
+        user, seva = await _add_capacity_seva(Session, capacity=3)
+        booking = await _book(Session, user, seva, 2, slot_date)
+        reserved = [await _reserved(Session, seva, slot_date)]
+        for payment_status in (PaymentStatus.FAILED, PaymentStatus.PENDING):
+            async with Session() as db:
+                await update_booking(
+                    db=db,
+                    booking_id=booking.id,
+                    booking_in=schemas.BookingUpdate(payment_status=payment_status),
+                    current_user=user,
+                )
+            reserved.append(await _reserved(Session, seva, slot_date))
+        return reserved
+
+    assert asyncio.run(fail_and_retry()) == [2, 0, 2]
\ No newline at end of file
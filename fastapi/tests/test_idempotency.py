@@ -0,0 +1,167 @@
+"""
+idempotent_call runs a request once per Idempotency-Key: duplicates get the
+stored response, a request that fails before committing frees the key, and
+one that fails or is cancelled after committing is never run again.
+
+The in-memory store runs anywhere; the database store's upserts need Postgres.
+"""
+import asyncio
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from app import models, schemas
+from app.utils import idempotency
+from app.utils.idempotency import (
+    Claim, DatabaseIdempotencyStore, IdempotencyStore, InMemoryIdempotencyStore, StoredResponse, idempotent_call
+)
+
+PAYLOAD = schemas.SevaCreate(name="Abhisheka", price=Decimal("100.00"))
+
+class Counter:
+    """A create-seva request that counts its runs and can fail or stall."""
+
+    def __init__(self, Session, fail_before_commit=False, fail_after_commit=False, stall=0.0):
+        self.Session = Session
+        self.fail_before_commit = fail_before_commit
+        self.fail_after_commit = fail_after_commit
+        self.stall = stall
+        self.runs = 0
+
+    async def __call__(self, db, payload=PAYLOAD):
+        async def call():
+            self.runs += 1
+            if self.fail_before_commit:
+                raise HTTPException(status_code=400, detail="Bad request")
+            seva = models.Seva(name=f"{payload.name} {self.runs}", price=payload.price)
+            db.add(seva)
+            await db.commit()
+            await asyncio.sleep(self.stall)
+            if self.fail_after_commit:
+                raise RuntimeError("Lost the connection")
+            return seva
+
+        return await idempotent_call(
+            "key-1", scope="sevas:test", payload=payload, response_model=schemas.Seva, db=db, call=call
+        )
+
+    async def once(self, payload=PAYLOAD):
+        async with self.Session() as db:
+            return await self(db, payload)
+
+@pytest.fixture
+def memory_store(monkeypatch):
+    store = InMemoryIdempotencyStore(ttl=60, wait=5)
+    monkeypatch.setattr(idempotency, "idempotency_store", store)
+    return store
+
+def test_concurrent_duplicates_run_once(Session, memory_store) -> None:
+    request = Counter(Session, stall=0.1)
+
+    async def burst():
+        return await asyncio.gather(*[request.once() for _ in range(5)])
+
+    responses = asyncio.run(burst())
+    assert request.runs == 1
+    assert len({json.loads(response.body)["id"] for response in responses}) == 1
+    assert sorted(response.headers.get("idempotent-replayed") or "" for response in responses) == [
+        "", "true", "true", "true", "true"
+    ]
+
+def test_different_body_conflicts(Session, memory_store) -> None:
+    request = Counter(Session)
+    asyncio.run(request.once())
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(request.once(schemas.SevaCreate(name="Other", price=Decimal("1.00"))))
+    assert error.value.status_code == 422
+
+def test_failure_before_commit_frees_the_key(Session, memory_store) -> None:
+    request = Counter(Session, fail_before_commit=True)
+    with pytest.raises(HTTPException):
+        asyncio.run(request.once())
+
+    request.fail_before_commit = False
+    response = asyncio.run(request.once())
+    assert response.status_code == 200
+    assert request.runs == 2
+
+def test_failure_after_commit_is_not_repeated(Session, memory_store) -> None:
+    request = Counter(Session, fail_after_commit=True)
+    with pytest.raises(RuntimeError):
+        asyncio.run(request.once())
+
+    request.fail_after_commit = False
+    response = asyncio.run(request.once())
+    assert response.status_code == 500
+    assert response.headers["idempotent-replayed"] == "true"
+    assert request.runs == 1
+
+def test_cancellation_after_commit_is_not_repeated(Session, memory_store) -> None:
+    request = Counter(Session, stall=10)
+
+    async def disconnect():
+        task = asyncio.create_task(request.once())
+        while request.runs == 0:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(disconnect())
+    response = asyncio.run(request.once())
+    assert response.headers["idempotent-replayed"] == "true"
+    assert request.runs == 1
+
+def test_store_must_implement_every_method() -> None:
+    class Incomplete(IdempotencyStore):
+        async def begin(self, key, fingerprint):
+            ...
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+@pytest.mark.postgres
+def test_request_outliving_its_lease_runs_once(Session, monkeypatch) -> None:
+    monkeypatch.setattr(idempotency, "idempotency_store", DatabaseIdempotencyStore(ttl=60, wait=5, lease=0.3))
+    request = Counter(Session, stall=1)
+
+    async def burst():
+        first = asyncio.create_task(request.once())
+        await asyncio.sleep(0.6)
+        return await asyncio.gather(first, request.once())
+
+    first, duplicate = asyncio.run(burst())
+    assert request.runs == 1
+    assert duplicate.headers["idempotent-replayed"] == "true"
+    assert json.loads(duplicate.body) == json.loads(first.body)
+
+@pytest.mark.postgres
+def test_taken_over_claim_cannot_complete(Session) -> None:
+    store = DatabaseIdempotencyStore(ttl=60, wait=1, lease=60)
+
+    async def take_over():
+        stale = await store.begin("key-1", "fingerprint")
+        # Expire the first claim, as if its worker had crashed
+        async with Session() as db:
+            await db.execute(
+                update(models.IdempotencyKey)
+                .where(models.IdempotencyKey.key == "key-1")
+                .values(expires_at=datetime.now(timezone.utc))
+            )
+            await db.commit()
+        current = await store.begin("key-1", "fingerprint")
+        assert isinstance(stale, Claim) and isinstance(current, Claim)
+
+        assert not await store.renew(stale)
+        await store.complete(stale, StoredResponse(200, {"from": "stale"}))
+        await store.release(stale)
+        assert await store.renew(current)
+        await store.complete(current, StoredResponse(200, {"from": "current"}))
+        return await store.begin("key-1", "fingerprint")
+
+    assert asyncio.run(take_over()).body == {"from": "current"}
\ No newline at end of file
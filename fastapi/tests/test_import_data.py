@@ -0,0 +1,44 @@
+"""
+The column-wise member normalizer reads the committee's sheets the way the
+row-by-row csv.DictReader importer did, including malformed ones.
+"""
+from app.utils.import_data import load_member_frame, read_csv_frame
+
+def _write(path, text: str) -> str:
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def test_ragged_rows_are_read_like_dictreader(tmp_path) -> None:
+    frame = read_csv_frame(_write(tmp_path / "ragged.csv", (
+        "A,B,C\n"
+        "1,2,3\n"
+        "4,5\n"
+        "6,7,8,9,10\n"
+        '"x, y",z,w\n'
+    )))
+    assert list(frame.columns) == ["A", "B", "C"]
+    assert frame.values.tolist() == [["1", "2", "3"], ["4", "5", ""], ["6", "7", "8"], ["x, y", "z", "w"]]
+
+def test_duplicated_columns_keep_the_last(tmp_path) -> None:
+    frame = read_csv_frame(_write(tmp_path / "dup.csv", "ADDR CODE,MOBILE,MOBILE\nA1,111,222\n"))
+    assert frame["MOBILE"].tolist() == ["222"]
+
+def test_malformed_member_rows_are_normalized(tmp_path) -> None:
+    members = _write(tmp_path / "members.csv", (
+        "MEMBER CODE,ADDR CODE,FIRST NAME,SURNAME\n"
+        "M1,A1,Ganesh,Kamath,extra\n"
+        "M2,A2,Suresh\n"
+    ))
+    # No address columns at all
+    addresses = _write(tmp_path / "addresses.csv", (
+        "ADDR CODE,EMAIL-1,MOBILE\n"
+        "A1,ganesh@example.org,98765 43210\n"
+        "A2,suresh@example.org\n"
+    ))
+    frame = load_member_frame(members, addresses)
+
+    assert frame["error"].tolist() == [None, "Missing name information for member M2"]
+    ganesh = frame.iloc[0]
+    assert (ganesh["first_name"], ganesh["surname"]) == ("Ganesh", "Kamath")
+    assert (ganesh["email"], ganesh["mobile_no"]) == ("ganesh@example.org", "9876543210")
+    assert ganesh["postal_address"] == "Address not provided"
\ No newline at end of file
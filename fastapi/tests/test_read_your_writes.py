@@ -0,0 +1,101 @@
+"""
+Read-your-writes: a successful write hands the client a signed token, and
+its reads carrying the token go to the primary instead of the replica
+until the token expires.
+"""
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db import routing, session
+from app.db.routing import (
+    READ_YOUR_WRITES_COOKIE,
+    READ_YOUR_WRITES_HEADER,
+    ReadRouter,
+    ReadYourWritesMiddleware,
+    _signature,
+    read_session,
+    read_your_writes_token,
+    wrote_recently,
+)
+
+def test_fresh_token_is_valid() -> None:
+    assert wrote_recently(read_your_writes_token())
+
+def test_token_expires(monkeypatch) -> None:
+    token = read_your_writes_token()
+    now = time.time()
+    monkeypatch.setattr(routing.time, "time", lambda: now + settings.READ_YOUR_WRITES_SECONDS + 1)
+    assert not wrote_recently(token)
+
+@pytest.mark.parametrize("token", [
+    None,
+    "",
+    "garbage",
+    # Extended without the secret key
+    f"{int(time.time()) + 3600}.{_signature(str(int(time.time()) + 5))}",
+    f"{int(time.time()) + 3600}.{'0' * 32}",
+    f"-1.{_signature('-1')}",
+])
+def test_invalid_tokens_are_rejected(token) -> None:
+    assert not wrote_recently(token)
+
+@pytest.fixture
+def client(Session, monkeypatch) -> TestClient:
+    """
+    An app with the middleware, a replica session factory and a route that
+    reports where read_session sent it.
+    """
+    router = ReadRouter()
+    monkeypatch.setattr(routing, "read_router", router)
+    monkeypatch.setattr(session, "ReplicaSessionLocal", Session)
+
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/write")
+    async def write(fail: bool = False):
+        if fail:
+            raise HTTPException(status_code=400, detail="Rejected")
+        return {}
+
+    @app.get("/read")
+    async def read(request: Request):
+        async with read_session(request):
+            pass
+        return {"primary": router.primary_reads, "replica": router.replica_reads}
+
+    return TestClient(app)
+
+def test_successful_write_hands_out_a_token(client) -> None:
+    response = client.post("/write")
+    token = response.headers[READ_YOUR_WRITES_HEADER]
+    assert wrote_recently(token)
+    assert response.cookies[READ_YOUR_WRITES_COOKIE] == token
+
+@pytest.mark.parametrize("method, path", [("get", "/read"), ("post", "/write?fail=true")])
+def test_reads_and_failed_writes_hand_out_no_token(client, method, path) -> None:
+    response = getattr(client, method)(path)
+    assert READ_YOUR_WRITES_HEADER not in response.headers
+    assert READ_YOUR_WRITES_COOKIE not in response.cookies
+
+def test_reads_without_a_token_use_the_replica(client) -> None:
+    assert client.get("/read").json() == {"primary": 0, "replica": 1}
+
+def test_reads_after_a_write_use_the_primary(client) -> None:
+    # The client's cookie jar sends the cookie back
+    client.post("/write")
+    assert client.get("/read").json() == {"primary": 1, "replica": 0}
+
+def test_echoed_header_routes_reads_to_the_primary(client) -> None:
+    token = read_your_writes_token()
+    assert client.get("/read", headers={READ_YOUR_WRITES_HEADER: token}).json() == {"primary": 1, "replica": 0}
+
+def test_expired_token_goes_back_to_the_replica(client, monkeypatch) -> None:
+    client.post("/write")
+    now = time.time()
+    monkeypatch.setattr(routing.time, "time", lambda: now + settings.READ_YOUR_WRITES_SECONDS + 1)
+    assert client.get("/read").json() == {"primary": 0, "replica": 1}
\ No newline at end of file
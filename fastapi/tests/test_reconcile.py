@@ -0,0 +1,146 @@
+"""
+Payment reconciliation: what each outcome does to the bookings with its
+gateway reference, how the result is counted, and receipt_id conflicts.
+Applying outcomes uses UPDATE ... FROM (VALUES ...), so most of these tests
+need Postgres.
+"""
+import asyncio
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app import models, schemas
+from app.api.api_v1.endpoints.bookings import reconcile_booking_payments
+from app.core.config import settings
+from app.models.booking import PaymentStatus
+from app.utils.reconcile import ReceiptConflict, reconcile_payments
+from app.utils.revenue import add_booking_to_summary
+
+PENDING, COMPLETED, FAILED = PaymentStatus.PENDING, PaymentStatus.COMPLETED, PaymentStatus.FAILED
+
+async def _add_bookings(Session, bookings) -> dict:
+    """Create a booking of one Rs. 100 item per (gateway ref, status, receipt_id)."""
+    async with Session() as db:
+        user = models.User(first_name="Test", surname="User", email="user@example.org", mobile_no="9999999999")
+        seva = models.Seva(name="Seva", price=Decimal("100.00"))
+        db.add_all([user, seva])
+        await db.flush()
+        ids = {}
+        for i, (ref, payment_status, receipt_id) in enumerate(bookings):
+            booking = models.Booking(
+                user_id=user.id,
+                total_amount=Decimal("100.00"),
+                payment_status=payment_status,
+                receipt_id=receipt_id,
+                payment_gateway_ref=ref,
+                items=[models.BookingItem(seva_id=seva.id, quantity=1, price_at_booking=Decimal("100.00"))],
+            )
+            db.add(booking)
+            await db.flush()
+            await add_booking_to_summary(db, booking.id)
+            ids[i] = booking.id
+        await db.commit()
+    return ids
+
+async def _state(Session):
+    async with Session() as db:
+        bookings = (await db.execute(select(models.Booking).order_by(models.Booking.payment_gateway_ref))).scalars()
+        summary = (await db.execute(select(models.SevaDailySummary))).scalars()
+        return (
+            [(b.payment_gateway_ref, b.payment_status, b.receipt_id) for b in bookings],
+            {row.payment_status: row.quantity for row in summary if row.quantity},
+        )
+
+async def _reconcile(Session, outcomes):
+    async with Session() as db:
+        return await reconcile_payments(db, outcomes)
+
+@pytest.mark.postgres
+def test_outcomes_are_matched_skipped_and_counted(Session) -> None:
+    async def run():
+        await _add_bookings(Session, [
+            ("pay_1", PENDING, None),
+            ("pay_2", FAILED, None),
+            ("pay_3", PENDING, None),
+            ("pay_3", PENDING, None),
+            ("pay_4", COMPLETED, "R4"),
+        ])
+        report = await _reconcile(Session, [
+            ("pay_1", FAILED, None),
+            # The last outcome for a reference wins
+            ("pay_1", COMPLETED, "R1"),
+            # FAILED bookings aren't revived
+            ("pay_2", COMPLETED, "R2"),
+            ("pay_3", FAILED, None),
+            # Already applied
+            ("pay_4", COMPLETED, "R4"),
+            ("pay_9", COMPLETED, "R9"),
+        ])
+        return report, await _state(Session)
+
+    report, (bookings, summary) = asyncio.run(run())
+    assert report == {
+        "received": 6, "matched": 4, "updated": 3, "unmatched": ["pay_9"], "skipped": ["pay_2"]
+    }
+    assert bookings == [
+        ("pay_1", COMPLETED, "R1"),
+        ("pay_2", FAILED, None),
+        ("pay_3", FAILED, None),
+        ("pay_3", FAILED, None),
+        ("pay_4", COMPLETED, "R4"),
+    ]
+    assert summary == {COMPLETED: 2, FAILED: 3}
+
+@pytest.mark.postgres
+def test_receipt_of_another_booking_conflicts_and_rolls_back(Session, monkeypatch) -> None:
+    # One outcome per chunk, so the conflict comes after a chunk was applied
+    monkeypatch.setattr(settings, "RECONCILE_CHUNK_SIZE", 1)
+
+    async def run():
+        await _add_bookings(Session, [("pay_1", PENDING, None), ("pay_2", COMPLETED, "R2")])
+        with pytest.raises(ReceiptConflict) as error:
+            await _reconcile(Session, [("pay_1", COMPLETED, "R1"), ("pay_3", COMPLETED, "R2")])
+        return error.value.refs, await _state(Session)
+
+    refs, (bookings, summary) = asyncio.run(run())
+    assert refs == ["pay_3"]
+    assert bookings == [("pay_1", PENDING, None), ("pay_2", COMPLETED, "R2")]
+    assert summary == {PENDING: 1, COMPLETED: 1}
+
+@pytest.mark.postgres
+def test_receipt_for_a_shared_reference_conflicts(Session) -> None:
+    async def run():
+        await _add_bookings(Session, [("pay_1", PENDING, None), ("pay_1", PENDING, None)])
+        async with Session() as db:
+            await reconcile_booking_payments(
+                db=db,
+                reconciliation_in=schemas.PaymentReconciliation(
+                    items=[{"payment_gateway_ref": "pay_1", "payment_status": COMPLETED, "receipt_id": "R1"}]
+                ),
+                current_user=None,
+            )
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run())
+    assert error.value.status_code == 409
+    assert "pay_1" in error.value.detail
+
+def test_duplicate_receipts_in_a_request_are_rejected(Session) -> None:
+    async def run():
+        async with Session() as db:
+            await reconcile_booking_payments(
+                db=db,
+                reconciliation_in=schemas.PaymentReconciliation(items=[
+                    {"payment_gateway_ref": "pay_1", "payment_status": COMPLETED, "receipt_id": "R1"},
+                    {"payment_gateway_ref": "pay_2", "payment_status": COMPLETED, "receipt_id": "R1"},
+                    {"payment_gateway_ref": "pay_3", "payment_status": COMPLETED, "receipt_id": "R3"},
+                ]),
+                current_user=None,
+            )
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run())
+    assert error.value.status_code == 400
+    assert "pay_1, pay_2" in error.value.detail
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+The revenue summary: bookings add their items to the SevaDailySummary row
+for their seva, day in REPORT_TIMEZONE and payment status, and a change of
+status moves them between rows. The summary is kept with Postgres upserts
+and time zone conversion, so these tests need Postgres.
+"""
+import asyncio
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app import models
+from app.api.api_v1.endpoints.reports import read_seva_revenue, read_seva_revenue_totals
+from app.models.booking import PaymentStatus
+from app.utils.revenue import add_booking_to_summary, remove_booking_from_summary, set_payment_status
+
+PENDING, COMPLETED, FAILED = PaymentStatus.PENDING, PaymentStatus.COMPLETED, PaymentStatus.FAILED
+
+# 20:00 UTC is already the next day in Asia/Kolkata
+EVENING_UTC = datetime(2024, 3, 31, 20, 0, tzinfo=timezone.utc)
+MORNING_UTC = datetime(2024, 4, 1, 5, 0, tzinfo=timezone.utc)
+
+async def _add_sevas(db, *prices):
+    sevas = [models.Seva(name=f"Seva {i}", price=Decimal(price)) for i, price in enumerate(prices, 1)]
+    user = models.User(first_name="Test", surname="User", email="user@example.org", mobile_no="9999999999")
+    db.add_all([user, *sevas])
+    await db.flush()
+    return user, sevas
+
+async def _add_booking(db, user, items, booking_date, payment_status=PENDING) -> models.Booking:
+    """Create a booking of (seva, quantity) items and add it to the summary."""
+    booking = models.Booking(
+        user_id=user.id,
+        booking_date=booking_date,
+        total_amount=sum(seva.price * quantity for seva, quantity in items),
+        payment_status=payment_status,
+        items=[
+            models.BookingItem(seva_id=seva.id, quantity=quantity, price_at_booking=seva.price)
+            for seva, quantity in items
+        ],
+    )
+    db.add(booking)
+    await db.flush()
+    await add_booking_to_summary(db, booking.id)
+    return booking
+
+async def _summary(db, sevas) -> set:
+    names = {seva.id: seva.name for seva in sevas}
+    rows = (await db.execute(select(models.SevaDailySummary))).scalars()
+    return {(names[row.seva_id], row.summary_date, row.payment_status, row.quantity, row.amount) for row in rows}
+
+@pytest.mark.postgres
+def test_bookings_add_up_per_seva_day_and_status(Session) -> None:
+    async def run():
+        async with Session() as db:
+            user, (lamp, puja) = await _add_sevas(db, "100.00", "250.00")
+            await _add_booking(db, user, [(lamp, 2), (puja, 1)], EVENING_UTC)
+            await _add_booking(db, user, [(lamp, 1)], MORNING_UTC)
+            await _add_booking(db, user, [(lamp, 3)], MORNING_UTC, COMPLETED)
+            await db.commit()
+            return await _summary(db, [lamp, puja])
+
+    assert asyncio.run(run()) == {
+        ("Seva 1", date(2024, 4, 1), PENDING, 3, Decimal("300.00")),
+        ("Seva 1", date(2024, 4, 1), COMPLETED, 3, Decimal("300.00")),
+        ("Seva 2", date(2024, 4, 1), PENDING, 1, Decimal("250.00")),
+    }
+
+@pytest.mark.postgres
+def test_removed_booking_is_taken_out_of_the_summary(Session) -> None:
+    async def run():
+        async with Session() as db:
+            user, (lamp,) = await _add_sevas(db, "100.00")
+            kept = await _add_booking(db, user, [(lamp, 1)], MORNING_UTC)
+            removed = await _add_booking(db, user, [(lamp, 2)], MORNING_UTC)
+            await remove_booking_from_summary(db, removed.id)
+            await db.commit()
+            return await _summary(db, [lamp])
+
+    assert asyncio.run(run()) == {("Seva 1", date(2024, 4, 1), PENDING, 1, Decimal("100.00"))}
+
+@pytest.mark.postgres
+def test_payment_status_change_moves_the_amounts(Session) -> None:
+    async def run():
+        async with Session() as db:
+            user, (lamp, puja) = await _add_sevas(db, "100.00", "250.00")
+            booking = await _add_booking(db, user, [(lamp, 2), (puja, 1)], MORNING_UTC)
+            await set_payment_status(db, booking, COMPLETED)
+            # Setting the same status again changes nothing
+            await set_payment_status(db, booking, COMPLETED)
+            await db.commit()
+            return await _summary(db, [lamp, puja])
+
+    assert asyncio.run(run()) == {
+        ("Seva 1", date(2024, 4, 1), PENDING, 0, Decimal("0.00")),
+        ("Seva 1", date(2024, 4, 1), COMPLETED, 2, Decimal("200.00")),
+        ("Seva 2", date(2024, 4, 1), PENDING, 0, Decimal("0.00")),
+        ("Seva 2", date(2024, 4, 1), COMPLETED, 1, Decimal("250.00")),
+    }
+
+@pytest.mark.postgres
+def test_reports_read_the_summary(Session) -> None:
+    async def run():
+        async with Session() as db:
+            user, (lamp,) = await _add_sevas(db, "100.00")
+            failed = await _add_booking(db, user, [(lamp, 1)], datetime(2024, 4, 2, 5, 0, tzinfo=timezone.utc))
+            await _add_booking(db, user, [(lamp, 2)], MORNING_UTC, COMPLETED)
+            await _add_booking(db, user, [(lamp, 4)], datetime(2024, 4, 2, 5, 0, tzinfo=timezone.utc), COMPLETED)
+            await set_payment_status(db, failed, FAILED)
+            await db.commit()
+
+            daily = await read_seva_revenue(
+                start_date=None, end_date=None, seva_id=None, payment_status=None, db=db, current_user=None
+            )
+            totals = await read_seva_revenue_totals(
+                start_date=date(2024, 4, 1), end_date=date(2024, 4, 2), seva_id=lamp.id,
+                payment_status=COMPLETED, db=db, current_user=None
+            )
+            return daily, totals
+
+    daily, totals = asyncio.run(run())
+    # The emptied PENDING row isn't reported
+    assert [(row["summary_date"], row["payment_status"], row["quantity"], row["amount"]) for row in daily] == [
+        (date(2024, 4, 1), COMPLETED, 2, Decimal("200.00")),
+        (date(2024, 4, 2), COMPLETED, 4, Decimal("400.00")),
+        (date(2024, 4, 2), FAILED, 1, Decimal("100.00")),
+    ]
+    assert [(row["payment_status"], row["quantity"], row["amount"]) for row in totals] == [
+        (COMPLETED, 6, Decimal("600.00"))
+    ]
\ No newline at end of file
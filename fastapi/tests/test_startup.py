@@ -0,0 +1,50 @@
+"""
+A worker has to be ready to serve within STARTUP_TIME_BUDGET_SECONDS. The
+import of app.main and its startup hook are timed in a fresh interpreter,
+since this test process has already imported the app.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_SCRIPT = """
+import asyncio, json, sys
+from app.main import app, lifespan
+from app.core.startup import startup_timer
+
+async def start():
+    async with lifespan(app):
+        pass
+
+asyncio.run(start())
+print(json.dumps({
+    **startup_timer.stats(),
+    "heavy_modules": sorted(name for name in ("pandas", "numpy", "alembic") if name in sys.modules),
+}))
+"""
+
+@pytest.fixture(scope="module")
+def startup() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=PROJECT_DIR,
+        env={**os.environ, "CHECK_SCHEMA_ON_STARTUP": "false"},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_startup_is_within_budget(startup) -> None:
+    assert not startup["over_budget"], (
+        f"Startup took {startup['seconds']:.3f}s, over the {startup['budget_seconds']:.3f}s budget"
+    )
+
+def test_startup_does_not_load_import_only_dependencies(startup) -> None:
+    assert startup["heavy_modules"] == []
\ No newline at end of file
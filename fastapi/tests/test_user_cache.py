@@ -0,0 +1,98 @@
+"""
+get_current_user caches resolved users per worker. A change to a user made
+through the API or an incremental member import takes effect on this
+worker's next request, not after the cache TTL.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app import models, schemas
+from app.api.api_v1.endpoints.users import update_user
+from app.utils import security
+from app.utils.import_data import incremental_import_members_from_csv
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    security.user_cache.clear()
+    yield
+    security.user_cache.clear()
+
+async def _add_user(Session, **fields) -> models.User:
+    async with Session() as db:
+        user = models.User(first_name="Test", surname="User", mobile_no="9999999999", **fields)
+        db.add(user)
+        await db.commit()
+        return user
+
+async def _resolve(Session, user: models.User) -> models.User:
+    async with Session() as db:
+        resolved = await security.get_current_user(db=db, token=security.create_access_token(user.id))
+        return await security.get_current_active_superuser(current_user=resolved)
+
+def test_demoted_admin_loses_access_at_once(Session) -> None:
+    async def demote():
+        admin = await _add_user(Session, email="admin@example.org", is_admin=True)
+        other = await _add_user(Session, email="other@example.org", is_admin=True)
+        await _resolve(Session, admin)
+        assert security.user_cache.get(str(admin.id)) is not None
+
+        async with Session() as db:
+            await update_user(
+                db=db, user_id=admin.id, user_in=schemas.UserUpdate(is_admin=False), current_user=other
+            )
+        await _resolve(Session, admin)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(demote())
+    assert error.value.status_code == 403
+
+def test_promoted_user_gains_access_at_once(Session) -> None:
+    async def promote():
+        admin = await _add_user(Session, email="admin@example.org", is_admin=True)
+        user = await _add_user(Session, email="user@example.org")
+        with pytest.raises(HTTPException):
+            await _resolve(Session, user)
+
+        async with Session() as db:
+            await update_user(
+                db=db, user_id=user.id, user_in=schemas.UserUpdate(is_admin=True), current_user=admin
+            )
+        return await _resolve(Session, user)
+
+    assert asyncio.run(promote()).is_admin
+
+@pytest.mark.postgres
+def test_incremental_import_refreshes_cached_users(Session, tmp_path) -> None:
+    members = tmp_path / "members.csv"
+    addresses = tmp_path / "addresses.csv"
+    addresses.write_text(
+        "ADDR CODE,EMAIL-1,MOBILE,BLDG NAME,WING & FLAT NO,DETAILED ADDRESS,LOCATION\n"
+        "A1,member@example.org,9876543210,Shanti Sadan,A-12,Gokhale Road,Thane\n",
+        encoding="utf-8"
+    )
+
+    async def reimport(first_name: str) -> None:
+        members.write_text(f"MEMBER CODE,ADDR CODE,FIRST NAME,SURNAME\nM1,A1,{first_name},Kamath\n", encoding="utf-8")
+        async with Session() as db:
+            *_, errors = await db.run_sync(
+                lambda sync_db: incremental_import_members_from_csv(sync_db, str(members), str(addresses))
+            )
+        assert errors == []
+
+    async def rename() -> str:
+        await reimport("Ganesh")
+        async with Session() as db:
+            user = (await db.execute(
+                select(models.User).where(models.User.email == "member@example.org")
+            )).scalars().one()
+            token = security.create_access_token(user.id)
+            assert (await security.get_current_user(db=db, token=token)).first_name == "Ganesh"
+
+        await reimport("Ganapati")
+        async with Session() as db:
+            return (await security.get_current_user(db=db, token=token)).first_name
+
+    assert asyncio.run(rename()) == "Ganapati"
\ No newline at end of file